@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bootstrap_ci import RESAMPLE_BUDGET, bootstrap_ci  # noqa: E402
+
+# === CONFIG ===
+# Worst case for the grouped bootstrap: 1M posts, far past RESAMPLE_BUDGET,
+# in many small groups next to a few huge ones. The small groups are resampled
+# until the budget runs out; the rest take the normal interval.
+N_POSTS = 1_000_000
+N_SMALL_GROUPS = 1000
+SMALL_GROUP_SIZE = 150
+VALUE_COLS = ["Post_compound", "Comment_compound"]
+MISSING_RATE = 0.05
+SEED = 0
+
+
+def make_frame():
+    rng = np.random.default_rng(SEED)
+    n_small = N_SMALL_GROUPS * SMALL_GROUP_SIZE
+    groups = np.concatenate([
+        np.repeat(np.arange(N_SMALL_GROUPS), SMALL_GROUP_SIZE),
+        N_SMALL_GROUPS + rng.integers(0, 10, N_POSTS - n_small),
+    ])
+    df = pd.DataFrame({"Subreddit": groups.astype(str)})
+    for col in VALUE_COLS:
+        values = rng.uniform(-1, 1, N_POSTS)
+        values[rng.random(N_POSTS) < MISSING_RATE] = np.nan
+        df[col] = values
+    return df
+
+
+if __name__ == "__main__":
+    df = make_frame()
+    print(f"{len(df)} posts, {df['Subreddit'].nunique()} groups, RESAMPLE_BUDGET={RESAMPLE_BUDGET:,}")
+    start = time.perf_counter()
+    out = bootstrap_ci(df, "Subreddit", VALUE_COLS)
+    elapsed = time.perf_counter() - start
+    for col in VALUE_COLS:
+        print(f"{col}: {(out[f'{col}_ci_method'] == 'bootstrap').sum()} groups resampled")
+    print(f"[✓] bootstrap_ci over {len(VALUE_COLS)} columns: {elapsed:.1f}s")
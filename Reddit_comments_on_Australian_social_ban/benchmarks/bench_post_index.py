@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from post_index import INDEXED_COLUMNS, phrase_query, search, update_index  # noqa: E402
+
+# === CONFIG ===
+INPUT_CSV = "Reddit/results/preprocessing/reddit_cleaned_stage2.csv"
+SCALE = 20
+BAN_KEYWORDS = [
+    "social media ban", "under 16", "Online Safety", "age verification", "Albanese",
+    "let kids be kids", "Online Safety Commissioner", "digital ID", "age restriction",
+    "kids off social media",
+]
+# (phrases, post columns) pairs; the first is step2's stage 3 query
+QUERIES = [
+    (BAN_KEYWORDS, ["Title", "Search_Term"]),
+    (["tiktok"], ["Title", "Selftext", "Top_Comments"]),
+    (["privacy", "surveillance"], ["Selftext", "Top_Comments"]),
+    (["parents"], ["Title", "Selftext"]),
+    (["esafety"], ["Title", "Selftext", "Top_Comments"]),
+]
+
+
+def scan(df, phrases, columns):
+    pattern = "|".join(phrases)
+    mask = pd.Series(False, index=df.index)
+    for col in columns:
+        mask |= df[col].astype(str).str.contains(pattern, case=False, na=False)
+    return set(df.loc[mask, "URL"])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    base = pd.read_csv(INPUT_CSV)
+    df = pd.concat(
+        [base.assign(URL=base["URL"] + f"#{i}") for i in range(SCALE)], ignore_index=True
+    )
+    print(f"Posts: {len(base)} x {SCALE} = {len(df)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "post_index.sqlite")
+        _, build_time = timed(lambda: update_index(df, path))
+        _, noop_time = timed(lambda: update_index(df, path))
+        print(f"Index build: {build_time:.2f}s, incremental no-op update: {noop_time:.2f}s")
+
+        print(f"{'query':<40}{'hits':>8}{'str.contains (s)':>18}{'FTS5 (s)':>10}")
+        for phrases, columns in QUERIES:
+            expected, scan_time = timed(lambda: scan(df, phrases, columns))
+            fts_columns = [INDEXED_COLUMNS[c] for c in columns]
+            hits, fts_time = timed(lambda: search(phrase_query(phrases), fts_columns, path))
+            assert set(hits["URL"]) == expected, f"index results differ for {phrases}"
+            label = ", ".join(phrases)
+            label = label if len(label) <= 38 else label[:35] + "..."
+            print(f"{label:<40}{len(expected):>8}{scan_time:>18.3f}{fts_time:>10.3f}")
+    print("[✓] Index results identical to str.contains for every query")
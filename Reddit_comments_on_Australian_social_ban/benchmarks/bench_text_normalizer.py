@@ -0,0 +1,62 @@
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import TreebankWordTokenizer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from text_normalizer import TextNormalizer  # noqa: E402
+
+# === CONFIG ===
+INPUT_CSV = "Reddit/results/preprocessing/reddit_keywords_stage3.csv"
+SCALE = 100
+# The legacy path is ~200x slower, so it is timed on a slice and extrapolated
+LEGACY_SAMPLE = 200
+
+
+# === Legacy step6 preprocess_text (reference implementation) ===
+def legacy_preprocess_text(text):
+    text = text.lower()
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[^a-z\s]", "", text)
+    tokenizer = TreebankWordTokenizer()
+    tokens = tokenizer.tokenize(text)
+    tokens = [t for t in tokens if t not in stopwords.words("english") and len(t) >= 3]
+    lemmatizer = WordNetLemmatizer()
+    tokens = [lemmatizer.lemmatize(t) for t in tokens]
+    return tokens
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(INPUT_CSV)
+    texts = (df["Title"].fillna("") + " " + df["Selftext"].fillna("")).tolist()
+    corpus = texts * SCALE
+    print(f"Corpus: {len(texts)} docs x {SCALE} = {len(corpus)} docs")
+
+    sample = corpus[:LEGACY_SAMPLE]
+    legacy, legacy_time = timed(lambda: [legacy_preprocess_text(t) for t in sample])
+    legacy_rate = len(sample) / legacy_time
+
+    normalizer = TextNormalizer()
+    serial, serial_time = timed(lambda: [normalizer(t) for t in corpus])
+    pooled, pooled_time = timed(lambda: normalizer.normalize_many(corpus))
+
+    assert serial[:LEGACY_SAMPLE] == legacy, "normalizer output differs from legacy"
+    assert pooled == serial, "process-pool output differs from serial"
+
+    print(f"{'mode':<22}{'docs/s':>12}{'est. total (s)':>16}")
+    print(f"{'legacy':<22}{legacy_rate:>12.0f}{len(corpus) / legacy_rate:>16.1f}")
+    print(f"{'normalizer':<22}{len(corpus) / serial_time:>12.0f}{serial_time:>16.1f}")
+    print(f"{'normalizer (pool)':<22}{len(corpus) / pooled_time:>12.0f}{pooled_time:>16.1f}")
+    print(f"Lemma cache: {normalizer.lemmatize.cache_info()}")
+    print("[✓] Token output identical to legacy preprocess_text")
@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+
+import numpy as np
+from gensim import matutils
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lda_corpus import load_corpus, load_dictionary  # noqa: E402
+from lda_inference import INFER_CHUNK_SIZE  # noqa: E402
+from lda_sweep import COHERENCE_TOPN, umass_coherence  # noqa: E402
+from topic_backends import GensimLdaBackend, NmfBackend  # noqa: E402
+
+# === CONFIG ===
+NUM_TOPICS = 5
+LDA_KWARGS = {"passes": 10, "alpha": "auto", "random_state": 42}
+# Synthetic corpus: SCALE x the real one, built by resampling documents and
+# keeping each term occurrence with probability KEEP_RATE, so rows are not
+# exact duplicates but term statistics stay realistic.
+SCALE = 10
+KEEP_RATE = 0.8
+SEED = 42
+
+
+def synthetic_corpus(corpus, scale=SCALE, keep_rate=KEEP_RATE, seed=SEED):
+    rng = np.random.default_rng(seed)
+    docs = list(corpus)
+    scaled = []
+    for i in rng.integers(0, len(docs), size=len(docs) * scale):
+        bow = [(t, int(rng.binomial(c, keep_rate))) for t, c in docs[i]]
+        scaled.append([(t, c) for t, c in bow if c > 0])
+    return scaled
+
+
+def throughput(backend, corpus):
+    start = time.perf_counter()
+    for i in range(0, len(corpus), INFER_CHUNK_SIZE):
+        backend.topic_mixtures(corpus[i : i + INFER_CHUNK_SIZE])
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def coherence(backend, doc_term):
+    topics = backend.get_topics()
+    top_ids = [matutils.argsort(row, topn=COHERENCE_TOPN, reverse=True) for row in topics]
+    return umass_coherence(top_ids, doc_term)
+
+
+def run(label, corpus, dictionary):
+    doc_term = (matutils.corpus2csc(corpus, num_terms=len(dictionary)).T > 0).astype(np.int32).tocsc()
+    print(f"\n{label}: {len(corpus)} docs, {len(dictionary)} terms")
+    print(f"{'backend':<10}{'train (s)':>12}{'infer docs/s':>16}{'u_mass':>10}")
+    for backend in (GensimLdaBackend(NUM_TOPICS, **LDA_KWARGS), NmfBackend(NUM_TOPICS)):
+        start = time.perf_counter()
+        backend.fit(corpus, dictionary)
+        train_time = time.perf_counter() - start
+        rate = throughput(backend, corpus)
+        score = coherence(backend, doc_term)
+        print(f"{backend.name:<10}{train_time:>12.2f}{rate:>16.0f}{score:>10.4f}")
+
+
+if __name__ == "__main__":
+    dictionary = load_dictionary()
+    corpus = list(load_corpus())
+    run("Current corpus", corpus, dictionary)
+    run(f"Synthetic corpus ({SCALE}x)", synthetic_corpus(corpus), dictionary)
@@ -0,0 +1,142 @@
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from run_benchmarks import run_stage  # noqa: E402
+from synthetic_corpus import RAW_PATH, generate, load_profile  # noqa: E402
+
+# === CONFIG ===
+# Runs steps 2 and 7 with the pandas and the polars engine on the same
+# synthetic corpus and checks that both write the same outputs. Steps 5 and 6
+# run once (pandas only) to produce step 7's inputs. --check runs the
+# equality check alone at CHECK_SCALE, for CI after any filter chain change.
+SCALES = [1, 10]
+CHECK_SCALE = 1
+ENGINES = ["pandas", "polars"]
+# (name, script args, outputs compared between engines, files removed before each run)
+STAGES = [
+    ("step2", ["step2_preprocessing_pipeline.py"], [
+        "Reddit/results/preprocessing/reddit_cleaned_stage1.csv",
+        "Reddit/results/preprocessing/reddit_cleaned_stage2.csv",
+        "Reddit/results/preprocessing/reddit_keywords_stage3.csv",
+        "Reddit/results/preprocessing/filter_stats.json",
+    # The full-text index is incremental; each engine starts from an empty one
+    ], ["Reddit/results/preprocessing/post_index.sqlite"]),
+    ("step5", ["step5_sentiment_pipeline.py", "--no-plots"], None, []),
+    ("step6", ["step6_lda_master_pipeline.py", "--no-plots"], None, []),
+    ("step7", ["step7_sentiment_topic_overlay.py", "--no-plots"], [
+        "Reddit/results/sentiment_topic_overlay/merged_sentiment_and_topics.csv",
+        "Reddit/results/sentiment_topic_overlay/topic_sentiment_summary.md",
+        "Reddit/results/sentiment_topic_overlay/topic_weighted_sentiment.csv",
+    ], []),
+]
+RESULTS_PATH = "Reddit/results/benchmarks/engine_benchmarks.json"
+
+
+# CSVs are compared as frames (float columns to 1e-9 relative), anything
+# else byte for byte. Returns None when equal, else a short reason.
+def compare_output(expected, actual):
+    if not os.path.exists(actual):
+        return "missing"
+    if not expected.endswith(".csv"):
+        return None if filecmp.cmp(expected, actual, shallow=False) else "contents differ"
+    try:
+        pd.testing.assert_frame_equal(
+            pd.read_csv(expected), pd.read_csv(actual), check_exact=False, rtol=1e-9, check_dtype=False
+        )
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def run_scale(scale, keep=False):
+    workdir = tempfile.mkdtemp(prefix=f"reddit_engines_{scale}x_")
+    snapshot = os.path.join(workdir, "pandas_outputs")
+    results, mismatches = [], []
+    try:
+        rows = generate(os.path.join(workdir, RAW_PATH), scale, profile=load_profile())
+        print(f"[{scale}x] Generated {rows} posts ({workdir})")
+        with open(os.path.join(workdir, "bench.log"), "w", encoding="utf-8") as log:
+            for name, args, outputs, fresh in STAGES:
+                for engine in ENGINES if outputs is not None else ["pandas"]:
+                    for path in fresh:
+                        if os.path.exists(os.path.join(workdir, path)):
+                            os.remove(os.path.join(workdir, path))
+                    engine_args = ["--engine", engine] if outputs is not None else []
+                    code, wall, peak = run_stage([*args, *engine_args], workdir, log)
+                    results.append({
+                        "stage": name, "engine": engine, "scale": scale, "ok": code == 0,
+                        "wall_seconds": round(wall, 3), "peak_rss_mb": round(peak / 2**20, 1),
+                    })
+                    print(f"[{scale}x] {name} ({engine}): {'ok' if code == 0 else f'FAILED ({code})'} "
+                          f"{wall:.1f}s, {results[-1]['peak_rss_mb']} MB peak")
+                    if code != 0:
+                        raise RuntimeError(f"{name} failed; see {workdir}/bench.log")
+                    if outputs is None:
+                        continue
+                    for path in outputs:
+                        saved = os.path.join(snapshot, path)
+                        if engine == "pandas":
+                            os.makedirs(os.path.dirname(saved), exist_ok=True)
+                            shutil.copy2(os.path.join(workdir, path), saved)
+                            continue
+                        reason = compare_output(saved, os.path.join(workdir, path))
+                        if reason:
+                            mismatches.append(f"{name} @ {scale}x: {os.path.basename(path)}: {reason}")
+                            # Later stages read the pandas output either way
+                            shutil.copy2(saved, os.path.join(workdir, path))
+    except RuntimeError as e:
+        print(f"[{scale}x] {e}")
+        # A stage that fails counts as a mismatch, so the exit code catches it
+        mismatches.append(f"{scale}x: {e}")
+        keep = True
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pandas vs polars engine benchmark with output equality check")
+    parser.add_argument("--scales", type=float, nargs="+", default=SCALES)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--keep", action="store_true", help="keep each scale's working directory")
+    parser.add_argument("--check", action="store_true",
+                        help=f"equality check only: scale {CHECK_SCALE}, no results file")
+    args = parser.parse_args()
+    if args.check:
+        args.scales = [CHECK_SCALE]
+
+    start = time.perf_counter()
+    results, mismatches = [], []
+    for scale in args.scales:
+        r, m = run_scale(int(scale) if float(scale).is_integer() else scale, args.keep)
+        results += r
+        mismatches += m
+
+    if not args.check:
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "cpus": os.cpu_count(),
+                "results": results,
+                "mismatches": mismatches,
+            }, f, indent=2)
+        print(f"[✓] Results saved to {args.output} ({time.perf_counter() - start:.0f}s)")
+
+    for line in mismatches:
+        print(f"[mismatch] {line}")
+    if mismatches:
+        sys.exit(1)
+    print("[✓] pandas and polars engines wrote identical outputs")
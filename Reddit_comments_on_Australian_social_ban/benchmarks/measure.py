@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+import time
+
+# Usage: python measure.py RESULT_JSON COMMAND [ARGS...]
+#
+# Runs COMMAND and writes its exit code, wall time and peak RSS to
+# RESULT_JSON. On Linux a child's ru_maxrss starts from the peak of the
+# process that spawned it, so the harness (which holds a whole synthetic
+# corpus) cannot measure steps directly; this launcher imports nothing heavy
+# and forks the step itself, so the reading is the step's own.
+
+
+def measure(command):
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.execvp(command[0], command)
+        finally:
+            os._exit(127)
+    _, status, usage = os.wait4(pid, 0)
+    return {
+        "exit_code": os.waitstatus_to_exitcode(status),
+        "wall_seconds": time.perf_counter() - start,
+        # KiB on Linux, bytes on macOS
+        "peak_rss_bytes": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+    }
+
+
+if __name__ == "__main__":
+    result = measure(sys.argv[2:])
+    with open(sys.argv[1], "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    sys.exit(result["exit_code"])
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from synthetic_corpus import RAW_PATH, generate, load_profile  # noqa: E402
+
+# === CONFIG ===
+STEPS_DIR = os.path.dirname(BENCH_DIR)
+SCALES = [1, 10, 100, 1000]
+# (name, script args, input file whose rows count as the stage's throughput)
+STAGES = [
+    ("step2", ["step2_preprocessing_pipeline.py"], RAW_PATH),
+    ("step3", ["step3_filtering_pipeline_report.py", "--no-plots"], RAW_PATH),
+    ("step4", ["step4_reddit_eda.py", "--no-plots"], "Reddit/results/preprocessing/reddit_keywords_stage3.csv"),
+    ("step5", ["step5_sentiment_pipeline.py", "--no-plots"], "Reddit/results/preprocessing/reddit_keywords_stage3.csv"),
+    ("step6", ["step6_lda_master_pipeline.py", "--no-plots"], "Reddit/results/preprocessing/reddit_keywords_stage3.csv"),
+    ("step7", ["step7_sentiment_topic_overlay.py", "--no-plots"], "Reddit/results/topic_modeling/lda_topics.csv"),
+]
+RESULTS_PATH = "Reddit/results/benchmarks/pipeline_benchmarks.json"
+BASELINE_PATH = os.path.join(BENCH_DIR, "pipeline_baseline.json")
+# A stage regresses if its wall time or peak RSS grows by more than this
+TOLERANCE = 0.25
+# Runs shorter than this are too noisy to compare
+MIN_COMPARABLE_SECONDS = 1.0
+
+
+def count_rows(path):
+    if not os.path.exists(path):
+        return 0
+    return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=100_000))
+
+
+# Runs one step in `workdir` through measure.py, which reports the step's
+# own wall time and peak RSS
+def run_stage(args, workdir, log):
+    env = {**os.environ, "MPLBACKEND": "Agg"}
+    result_path = os.path.join(workdir, "measure.json")
+    subprocess.run(
+        [sys.executable, os.path.join(BENCH_DIR, "measure.py"), result_path,
+         sys.executable, os.path.join(STEPS_DIR, args[0]), *args[1:]],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    with open(result_path, encoding="utf-8") as f:
+        result = json.load(f)
+    return result["exit_code"], result["wall_seconds"], result["peak_rss_bytes"]
+
+
+def run_scale(scale, stages, keep=False):
+    workdir = tempfile.mkdtemp(prefix=f"reddit_bench_{scale}x_")
+    results = []
+    try:
+        start = time.perf_counter()
+        rows = generate(os.path.join(workdir, RAW_PATH), scale, profile=load_profile())
+        print(f"[{scale}x] Generated {rows} posts in {time.perf_counter() - start:.1f}s ({workdir})")
+        with open(os.path.join(workdir, "bench.log"), "w", encoding="utf-8") as log:
+            for name, args, input_path in stages:
+                n = count_rows(os.path.join(workdir, input_path))
+                code, wall, peak = run_stage(args, workdir, log)
+                result = {
+                    "stage": name, "scale": scale, "rows": n, "ok": code == 0,
+                    "wall_seconds": round(wall, 3), "peak_rss_mb": round(peak / 2**20, 1),
+                    "rows_per_second": round(n / wall, 1) if wall else None,
+                }
+                results.append(result)
+                print(
+                    f"[{scale}x] {name}: {'ok' if code == 0 else f'FAILED ({code})'} "
+                    f"{wall:.1f}s, {result['peak_rss_mb']} MB peak, {result['rows_per_second']} rows/s"
+                )
+                if code != 0:
+                    print(f"[{scale}x] Later stages depend on {name}; see {workdir}/bench.log")
+                    keep = True
+                    break
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# === Regression Check ===
+def compare(results, baseline, tolerance=TOLERANCE):
+    base = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        b = base.get((r["stage"], r["scale"]))
+        if b is None or not (r["ok"] and b["ok"]):
+            continue
+        for metric in ["wall_seconds", "peak_rss_mb"]:
+            if metric == "wall_seconds" and b[metric] < MIN_COMPARABLE_SECONDS:
+                continue
+            if r[metric] > b[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{r['stage']} @ {r['scale']}x: {metric} {b[metric]} -> {r[metric]} "
+                    f"(+{r[metric] / b[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmarks on synthetic corpora")
+    parser.add_argument("--scales", type=float, nargs="+", default=SCALES)
+    parser.add_argument("--stages", nargs="+", choices=[s[0] for s in STAGES], help="default: all")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--keep", action="store_true", help="keep each scale's working directory")
+    args = parser.parse_args()
+
+    stages = [s for s in STAGES if not args.stages or s[0] in args.stages]
+    results = []
+    for scale in args.scales:
+        results += run_scale(int(scale) if float(scale).is_integer() else scale, stages, args.keep)
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"[✓] Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"[✓] Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[regression] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"[✓] No regressions beyond {args.tolerance:.0%} of {args.baseline}")
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+RAW_PATH = "Reddit/results/reddit_social_media_ban_posts.csv"
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus_profile.json")
+CHUNK_ROWS = 50_000
+SEED = 42
+QUANTILE_POINTS = np.linspace(0, 1, 101)
+VOCAB_SIZE = 3000
+LANG_SAMPLE = 500
+
+# Same lists step2 uses for the profanity flag and the stage 3 keyword filter
+PROFANITY_WORDS = ["fuck", "shit", "bitch", "asshole", "dick", "bastard"]
+BAN_KEYWORDS = [
+    "social media ban", "under 16", "Online Safety", "age verification", "Albanese",
+    "let kids be kids", "Online Safety Commissioner", "digital ID", "age restriction",
+    "kids off social media",
+]
+# Filler for the non-English share, so langdetect rejects those posts
+NON_ENGLISH_WORDS = [
+    "redes", "sociales", "prohibición", "niños", "menores", "gobierno", "padres", "ley",
+    "soziale", "medien", "verbot", "kinder", "eltern", "regierung", "gesetz", "jugendliche",
+]
+# Used only when there is neither a saved profile nor a raw export to
+# measure: the 6268-row scrape over step1's subreddits and search terms, with
+# rough rates. Run with --profile against the real export to replace it.
+DEFAULT_PROFILE = {
+    "rows": 6268,
+    "subreddits": [
+        "australia", "AustralianPolitics", "technology", "news", "Futurology", "Parenting",
+        "AskParents", "teenagers", "YouthRights", "DigitalRights", "privacy", "Education",
+        "SocialMedia", "MediaSkeptic", "AskAnAustralian",
+    ],
+    "search_terms": [
+        "Online Safety Amendment Act 2024", "social media age restriction Australia",
+        "age verification social media Australia", "Online Safety Commissioner Australia",
+        "Albanese social media ban", "Australia under 16 social media ban", "Australia digital ID law",
+        "let kids be kids campaign", "parental controls on social media", "protecting children online",
+        "social media harm to teens", "is TikTok dangerous for kids", "online safety for teenagers",
+        "kids off social media", "teenagers banned from Instagram", "do teens need social media",
+        "social media addiction teens Australia", "young people and social media ban",
+        "should kids be banned from social media",
+    ],
+    "pair_weights": None,
+    "score": [0, 0, 1, 1, 2, 3, 5, 12, 40, 250, 9000],
+    "num_comments": [0, 0, 1, 2, 4, 7, 12, 25, 60, 250, 5000],
+    "title_words": [1, 4, 6, 7, 8, 10, 11, 13, 16, 22, 60],
+    "selftext_words": [0, 0, 0, 0, 0, 20, 60, 110, 200, 400, 3000],
+    "comment_words": [1, 5, 9, 14, 19, 26, 34, 45, 65, 110, 1500],
+    "created_epoch": [
+        1577836800, 1672531200, 1688169600, 1701388800, 1709251200, 1717200000,
+        1725148800, 1730419200, 1733011200, 1738368000, 1748736000,
+    ],
+    "duplicate_rate": 0.12,
+    "placeholder_rate": 0.02,
+    "anonymous_rate": 0.03,
+    "non_english_rate": 0.02,
+    "profanity_rate": 0.08,
+    "keyword_rate": 0.3,
+    "vocab": None,
+}
+DEFAULT_VOCAB = (
+    "social media ban kids children teens australia government age verification online safety "
+    "parents platforms under law tiktok instagram facebook youtube privacy digital id young people "
+    "school think would like just people need really know time years policy rules enforce vpn "
+    "commissioner albanese labor liberal harm mental health addiction research evidence data "
+    "companies tech accounts access protect support against free speech rights internet users"
+).split()
+
+WORD_RE = re.compile(r"[a-z']+")
+
+
+# === Profile ===
+# Distributions are stored as 101 quantiles (sampled by inverse CDF), rates as
+# fractions of the raw export, and the vocabulary as word frequencies.
+def quantiles(values):
+    values = pd.to_numeric(values, errors="coerce").dropna()
+    return np.quantile(values, QUANTILE_POINTS).tolist() if len(values) else [0.0]
+
+
+def word_counts(texts):
+    return texts.fillna("").astype(str).str.split().str.len()
+
+
+def build_profile(df):
+    pairs = df.groupby(["Subreddit", "Search_Term"]).size()
+    text = (df["Title"].fillna("") + " " + df["Selftext"].fillna("")).str.lower()
+    comments = df["Top_Comments"].fillna("").astype(str).str.split("\n---\n").explode()
+    vocab = Counter(w for t in text for w in WORD_RE.findall(t))
+
+    non_english = 0.0
+    try:
+        from langdetect import LangDetectException, detect
+
+        sample = text[text.str.len() > 20].sample(min(LANG_SAMPLE, len(text)), random_state=SEED)
+        langs = []
+        for t in sample:
+            try:
+                langs.append(detect(t))
+            except LangDetectException:
+                langs.append("")
+        non_english = float(np.mean([lang != "en" for lang in langs])) if langs else 0.0
+    except ImportError:
+        pass
+
+    if "Created_Epoch" in df.columns:
+        epochs = df["Created_Epoch"]
+    else:
+        epochs = (pd.to_datetime(df["Created_UTC"], errors="coerce") - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+    pattern = "|".join(BAN_KEYWORDS)
+    return {
+        "rows": len(df),
+        "subreddits": pairs.index.get_level_values(0).tolist(),
+        "search_terms": pairs.index.get_level_values(1).tolist(),
+        "pair_weights": (pairs / pairs.sum()).tolist(),
+        "score": quantiles(df["Score"]),
+        "num_comments": quantiles(df["Num_Comments"]),
+        "title_words": quantiles(word_counts(df["Title"])),
+        "selftext_words": quantiles(word_counts(df["Selftext"])),
+        "comment_words": quantiles(word_counts(comments[comments != ""])),
+        "created_epoch": quantiles(epochs),
+        "duplicate_rate": float(df["URL"].duplicated().mean()),
+        "placeholder_rate": float(df["Title"].fillna("").str.strip().str.lower().isin(["[deleted]", "[removed]"]).mean()),
+        "anonymous_rate": float((df["Author"].isna() | (df["Author"].astype(str).str.lower() == "none")).mean()),
+        "non_english_rate": non_english,
+        "profanity_rate": float(text.apply(lambda t: any(w in t for w in PROFANITY_WORDS)).mean()),
+        "keyword_rate": float(df["Title"].str.contains(pattern, case=False, na=False).mean()),
+        "vocab": dict(vocab.most_common(VOCAB_SIZE)),
+    }
+
+
+def load_profile(path=PROFILE_PATH):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if os.path.exists(RAW_PATH):
+        return build_profile(pd.read_csv(RAW_PATH))
+    return DEFAULT_PROFILE
+
+
+# === Generator ===
+class CorpusGenerator:
+    def __init__(self, profile, seed=SEED):
+        self.profile = profile
+        self.rng = np.random.default_rng(seed)
+        if profile.get("pair_weights"):
+            self.subreddits = np.array(profile["subreddits"], dtype=object)
+            self.terms = np.array(profile["search_terms"], dtype=object)
+            self.pair_p = np.asarray(profile["pair_weights"], dtype=float)
+        else:
+            subs, terms = profile["subreddits"], profile["search_terms"]
+            self.subreddits = np.array([s for s in subs for _ in terms], dtype=object)
+            self.terms = np.array([t for _ in subs for t in terms], dtype=object)
+            self.pair_p = np.full(len(self.subreddits), 1 / len(self.subreddits))
+        self.pair_p /= self.pair_p.sum()
+        vocab = profile.get("vocab") or dict.fromkeys(DEFAULT_VOCAB, 1)
+        self.vocab = np.array(list(vocab), dtype=object)
+        self.vocab_p = np.asarray(list(vocab.values()), dtype=float)
+        self.vocab_p /= self.vocab_p.sum()
+        self.non_english = np.array(NON_ENGLISH_WORDS, dtype=object)
+        self.next_id = 0
+
+    def sample(self, key, n):
+        q = np.asarray(self.profile[key], dtype=float)
+        return np.interp(self.rng.random(n), np.linspace(0, 1, len(q)), q)
+
+    def texts(self, lengths, words=None):
+        words = self.vocab if words is None else words
+        p = self.vocab_p if words is self.vocab else None
+        lengths = np.maximum(lengths.astype(np.int64), 0)
+        tokens = words[self.rng.choice(len(words), size=int(lengths.sum()), p=p)]
+        return [" ".join(chunk) for chunk in np.split(tokens, np.cumsum(lengths)[:-1])]
+
+    def chunk(self, n):
+        rng, profile = self.rng, self.profile
+        pair = rng.choice(len(self.pair_p), size=n, p=self.pair_p)
+        non_english = rng.random(n) < profile["non_english_rate"]
+
+        titles = np.array(self.texts(np.maximum(self.sample("title_words", n), 1)), dtype=object)
+        bodies = np.array(self.texts(self.sample("selftext_words", n)), dtype=object)
+        if non_english.any():
+            k = int(non_english.sum())
+            titles[non_english] = self.texts(np.maximum(self.sample("title_words", k), 3), self.non_english)
+            bodies[non_english] = self.texts(np.maximum(self.sample("selftext_words", k), 10), self.non_english)
+
+        keyword = rng.random(n) < profile["keyword_rate"]
+        picks = rng.choice(BAN_KEYWORDS, size=int(keyword.sum()))
+        titles[keyword] = [f"{t} {k}" for t, k in zip(titles[keyword], picks)]
+        profane = rng.random(n) < profile["profanity_rate"]
+        picks = rng.choice(PROFANITY_WORDS, size=int(profane.sum()))
+        bodies[profane] = [f"{b} {w}" for b, w in zip(bodies[profane], picks)]
+        titles[rng.random(n) < profile["placeholder_rate"]] = "[deleted]"
+
+        num_comments = np.round(self.sample("num_comments", n)).astype(np.int64)
+        per_post = np.minimum(num_comments, 5)
+        comments = self.texts(np.maximum(self.sample("comment_words", int(per_post.sum())), 1))
+        bounds = np.concatenate([[0], np.cumsum(per_post)])
+        top_comments = ["\n---\n".join(comments[bounds[i] : bounds[i + 1]]) for i in range(n)]
+
+        epochs = np.round(self.sample("created_epoch", n)).astype(np.int64)
+        ids = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        authors = np.array([f"user_{i}" for i in rng.integers(0, max(n // 2, 1), size=n)], dtype=object)
+        authors[rng.random(n) < profile["anonymous_rate"]] = "None"
+
+        df = pd.DataFrame(
+            {
+                "Subreddit": self.subreddits[pair],
+                "Search_Term": self.terms[pair],
+                "Title": titles,
+                "Selftext": bodies,
+                "Score": np.round(self.sample("score", n)).astype(np.int64),
+                "Num_Comments": num_comments,
+                "Author": authors,
+                "URL": [f"https://www.reddit.com/r/{s}/comments/{np.base_repr(i, 36).lower()}/" for s, i in zip(self.subreddits[pair], ids)],
+                "Created_UTC": pd.to_datetime(epochs, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+                "Created_Epoch": epochs,
+                "Top_Comments": top_comments,
+            }
+        )
+        # Duplicates are the same post found again under another search term
+        dup = np.flatnonzero(rng.random(n) < profile["duplicate_rate"])
+        if len(dup):
+            rows = np.arange(n)
+            rows[dup] = rng.integers(0, n, size=len(dup))
+            df = df.iloc[rows].reset_index(drop=True)
+            df.loc[dup, "Search_Term"] = rng.choice(self.terms, size=len(dup))
+        return df
+
+
+# Writes scale x the profiled row count to `path`, CHUNK_ROWS at a time
+def generate(path, scale=1, profile=None, seed=SEED, chunk_rows=CHUNK_ROWS):
+    profile = profile or load_profile()
+    generator = CorpusGenerator(profile, seed)
+    total = int(round(profile["rows"] * scale))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    written = 0
+    while written < total:
+        n = min(chunk_rows, total - written)
+        generator.chunk(n).to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += n
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic Reddit corpus generator")
+    parser.add_argument("--profile", action="store_true", help=f"measure {RAW_PATH} and save it to {PROFILE_PATH}")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--output", default="Reddit/results/synthetic/reddit_social_media_ban_posts.csv")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+    if args.profile:
+        profile = build_profile(pd.read_csv(RAW_PATH))
+        with open(PROFILE_PATH, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=1)
+        print(f"[✓] Profile of {profile['rows']} rows saved to {PROFILE_PATH}")
+    else:
+        rows = generate(args.output, args.scale, seed=args.seed)
+        print(f"[✓] {rows} synthetic posts written to {args.output}")
@@ -0,0 +1,111 @@
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+N_BOOT = 2000
+CI_LEVEL = 0.95
+SEED = 42
+# Upper bound on resample cells (boot rows x posts) materialised at once
+MAX_CELLS = 5_000_000
+# Upper bound on resampled cells (n_boot x resampled posts) per column. Groups
+# are resampled smallest first until the next one would exceed it; the rest
+# (the largest groups, where the bootstrap distribution of a mean is closest
+# to Gaussian) take the normal interval, so the cost stays flat however large
+# the input is.
+RESAMPLE_BUDGET = 100_000_000
+
+
+# === Vectorized Grouped Bootstrap ===
+# Every group is resampled with replacement inside its own slice of a
+# group-sorted value array: one uniform draw per cell is scaled by the size of
+# the cell's group, so all groups share one gather and one np.add.reduceat.
+# Returns an (n_boot, n_groups) array of resampled means.
+def grouped_bootstrap_means(values, codes, n_groups, n_boot=N_BOOT, seed=SEED):
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind="stable")
+    sorted_values = values[order]
+    sizes = np.bincount(codes, minlength=n_groups)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    means = np.full((n_boot, n_groups), np.nan)
+    present = sizes > 0
+    if not present.any():
+        return means
+
+    cell_size = np.repeat(sizes, sizes).astype(np.float64)
+    cell_offset = np.repeat(offsets, sizes)
+    starts = offsets[present]
+
+    rng = np.random.default_rng(seed)
+    n_cells = len(sorted_values)
+    rows_per_chunk = max(1, MAX_CELLS // max(n_cells, 1))
+    for start in range(0, n_boot, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_boot)
+        u = rng.random((stop - start, n_cells))
+        idx = cell_offset + (u * cell_size).astype(np.int64)
+        sums = np.add.reduceat(sorted_values[idx], starts, axis=1)
+        means[start:stop, present] = sums / sizes[present]
+    return means
+
+
+# === Percentile Intervals per Group ===
+# One row per group: N_Posts, then for each value column its mean, the
+# <col>_ci_low / <col>_ci_high bounds and <col>_ci_method. Whether a group is
+# resampled depends on its non-missing values in that column.
+def bootstrap_ci(df, group_col, value_cols, n_boot=N_BOOT, ci=CI_LEVEL, seed=SEED):
+    data = df[[group_col] + list(value_cols)].dropna(subset=[group_col])
+    codes, groups = pd.factorize(data[group_col], sort=True)
+    n_groups = len(groups)
+    alpha = (1 - ci) / 2
+    z = NormalDist().inv_cdf(1 - alpha)
+
+    out = pd.DataFrame({group_col: groups})
+    out["N_Posts"] = np.bincount(codes, minlength=n_groups)
+
+    for i, col in enumerate(value_cols):
+        vals = data[col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(vals)
+        v, c = vals[valid], codes[valid]
+        counts = np.bincount(c, minlength=n_groups)
+        sums = np.bincount(c, weights=v, minlength=n_groups)
+        sq_sums = np.bincount(c, weights=v * v, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sums / counts
+            # Sample (ddof=1) standard error for the normal fallback
+            var = np.maximum(sq_sums - counts * mean**2, 0) / (counts - 1)
+            se = np.sqrt(var / counts)
+        low, high = mean - z * se, mean + z * se
+
+        # Every group is resampled while the budget lasts, smallest first;
+        # the groups left over are compacted away so they cost nothing inside
+        # the resampling matrix.
+        exact = counts > 0
+        if counts.sum() * n_boot > RESAMPLE_BUDGET:
+            by_size = np.flatnonzero(exact)[np.argsort(counts[exact], kind="stable")]
+            fits = np.cumsum(counts[by_size]) * n_boot <= RESAMPLE_BUDGET
+            exact[:] = False
+            exact[by_size[fits]] = True
+        small_codes = np.cumsum(exact) - 1
+        in_exact = exact[c]
+        if exact.any():
+            boot = grouped_bootstrap_means(
+                v[in_exact],
+                small_codes[c[in_exact]],
+                int(exact.sum()),
+                n_boot=n_boot,
+                seed=seed + i,
+            )
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                boot_low, boot_high = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+            low[exact], high[exact] = boot_low, boot_high
+
+        out[col] = mean
+        out[f"{col}_ci_low"] = low
+        out[f"{col}_ci_high"] = high
+        out[f"{col}_ci_method"] = np.where(exact, "bootstrap", "normal")
+    return out
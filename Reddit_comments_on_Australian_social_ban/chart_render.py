@@ -0,0 +1,147 @@
+import csv
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+RENDER_LOG = "Reddit/results/chart_render_times.csv"
+MANIFEST_NAME = ".chart_hashes.json"
+WORKERS = None
+
+
+# === Chart Specs ===
+# A chart is a draw function from charts.py, the small aggregated input it
+# plots and its style keywords. The digest covers all of them plus the source
+# of the draw function's whole module (shared helpers and constants too), so a
+# chart is redrawn only when something it depends on changed.
+class Chart:
+    def __init__(self, path, draw, data, style=None, dpi=100, bbox_inches=None):
+        self.path = path
+        self.draw = draw
+        self.data = data
+        self.style = style or {}
+        self.dpi = dpi
+        self.bbox_inches = bbox_inches
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def digest(self):
+        h = hashlib.sha256()
+        h.update(f"{self.draw.__module__}.{self.draw.__qualname__}".encode("utf-8"))
+        h.update(inspect.getsource(sys.modules[self.draw.__module__]).encode("utf-8"))
+        _update_digest(h, {"dpi": self.dpi, "bbox_inches": self.bbox_inches, "style": self.style})
+        _update_digest(h, self.data)
+        return h.hexdigest()
+
+
+def _update_digest(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        if isinstance(obj, pd.DataFrame):
+            columns, dtypes = list(obj.columns), list(map(str, obj.dtypes))
+        else:
+            columns, dtypes = [obj.name], [str(obj.dtype)]
+        h.update(repr((type(obj).__name__, columns, dtypes)).encode("utf-8"))
+        if not isinstance(obj, pd.Index):
+            _update_digest(h, obj.index)
+        h.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode("utf-8"))
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            _update_digest(h, key)
+            _update_digest(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode("utf-8"))
+        for item in obj:
+            _update_digest(h, item)
+    else:
+        h.update(repr(obj).encode("utf-8"))
+
+
+# === Rendering ===
+def render_chart(chart):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    chart.draw(plt, chart.data, **chart.style)
+    plt.savefig(chart.path, dpi=chart.dpi, bbox_inches=chart.bbox_inches)
+    plt.close("all")
+    return time.perf_counter() - start
+
+
+def _load_manifest(folder):
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Renders every chart whose digest changed (or whose PNG is missing) and
+# returns {path: seconds}, None for charts skipped as unchanged. Steps 4 and 5
+# are top-level scripts, so workers must be forked: a spawned worker would
+# re-run the step on import. Without fork, charts render one after another.
+def render_charts(charts, workers=WORKERS, force=False, log_path=RENDER_LOG):
+    start = time.perf_counter()
+    manifests = {}
+    digests = {}
+    stale = []
+    for chart in charts:
+        folder = os.path.dirname(chart.path) or "."
+        os.makedirs(folder, exist_ok=True)
+        manifest = manifests.setdefault(folder, _load_manifest(folder))
+        digests[chart.path] = chart.digest()
+        if force or not os.path.exists(chart.path) or manifest.get(chart.name) != digests[chart.path]:
+            stale.append(chart)
+
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            seconds = list(pool.map(render_chart, stale))
+    else:
+        seconds = [render_chart(chart) for chart in stale]
+
+    times = {chart.path: None for chart in charts}
+    for chart, elapsed in zip(stale, seconds):
+        times[chart.path] = elapsed
+        manifests[os.path.dirname(chart.path) or "."][chart.name] = digests[chart.path]
+    for folder, manifest in manifests.items():
+        with open(os.path.join(folder, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    log_render_times(times, log_path)
+    for path, elapsed in times.items():
+        status = "unchanged, skipped" if elapsed is None else f"{elapsed:.2f}s"
+        print(f"[chart] {os.path.basename(path)}: {status}")
+    print(
+        f"[✓] Rendered {len(stale)} of {len(charts)} charts in {time.perf_counter() - start:.1f}s "
+        f"({workers or 0} worker{'s' if workers != 1 else ''})"
+    )
+    return times
+
+
+def log_render_times(times, log_path=RENDER_LOG):
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    new_file = not os.path.exists(log_path)
+    stamp = datetime.now().isoformat(timespec="seconds")
+    with open(log_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["Timestamp", "Chart", "Render_Seconds", "Skipped"])
+        for path, elapsed in times.items():
+            writer.writerow([stamp, path, "" if elapsed is None else f"{elapsed:.3f}", elapsed is None])
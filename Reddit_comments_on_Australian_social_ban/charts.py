@@ -0,0 +1,213 @@
+import numpy as np
+
+from pipeline_startup import load_seaborn
+
+# Chart drawing functions for chart_render. Each takes pyplot, its small
+# aggregated input and style keywords, and draws one figure; chart_render
+# saves and closes it.
+
+# === Aggregated Inputs ===
+KDE_GRID = 200
+KDE_FINE_BINS = 1024
+
+
+# Histogram counts plus a Gaussian KDE scaled to counts (what seaborn's
+# histplot(kde=True) draws), computed from a fine pre-binning so the cost is
+# one pass over the values however many posts there are
+def histogram_summary(values, bins=30):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    summary = {"edges": edges, "counts": counts, "kde_x": None, "kde_y": None}
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if std > 0:
+        bw = std * n ** (-1 / 5)  # Scott's rule
+        fine, fine_edges = np.histogram(
+            values, bins=KDE_FINE_BINS, range=(values.min() - 3 * bw, values.max() + 3 * bw)
+        )
+        centers = (fine_edges[:-1] + fine_edges[1:]) / 2
+        grid = np.linspace(values.min(), values.max(), KDE_GRID)
+        kernel = np.exp(-0.5 * ((grid[:, None] - centers[None, :]) / bw) ** 2)
+        density = kernel @ fine / (n * bw * np.sqrt(2 * np.pi))
+        summary["kde_x"] = grid
+        summary["kde_y"] = density * n * (edges[1] - edges[0])
+    return summary
+
+
+def _draw_histogram(ax, hist, color):
+    edges = hist["edges"]
+    ax.bar(edges[:-1], hist["counts"], width=np.diff(edges), align="edge",
+           color=color, alpha=0.75, edgecolor="black", linewidth=0.5)
+    if hist["kde_x"] is not None:
+        ax.plot(hist["kde_x"], hist["kde_y"], color=color)
+    ax.set_ylabel("Count")
+
+
+# === Step 3: Filtering Pipeline ===
+def filtering_bar(plt, data):
+    stages, vals = data["stages"], data["counts"]
+    plt.figure(figsize=(12, 7))
+    y_positions = list(range(len(stages)))
+    plt.barh(y_positions, vals, height=0.4, color="orange")
+    for i, val in enumerate(vals):
+        if val > 0:
+            plt.text(val + 100, i, str(val), va="center", fontsize=8)
+    plt.yticks(y_positions, stages)
+    plt.gca().invert_yaxis()
+    plt.xlabel("Number of Posts")
+    plt.title("Reddit Filtering Pipeline")
+    plt.tight_layout()
+
+
+def filtering_line(plt, data):
+    plt.figure(figsize=(14, 6))
+    plt.plot(data["stages"], data["counts"], marker="o", color="orange", label="Filtered Dataset")
+    plt.xticks(rotation=45, ha="right")
+    plt.ylabel("Posts Remaining")
+    plt.title("Reddit Filtering Pipeline")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+
+# === Step 4: EDA ===
+def count_bars(plt, counts, title, ylabel, color="orange"):
+    plt.figure(figsize=(10, 6))
+    counts.plot(kind="bar", color=color)
+    plt.title(title)
+    plt.ylabel(ylabel)
+    plt.tight_layout()
+
+
+def top_words(plt, word_df, title):
+    plt.figure(figsize=(10, 6))
+    load_seaborn().barplot(data=word_df, x="Count", y="Word", color="orange")
+    plt.title(title)
+    plt.tight_layout()
+
+
+def score_comments(plt, data):
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
+    _draw_histogram(axes[0], data["score"], "orange")
+    axes[0].set_title("Score Distribution")
+    axes[0].set_xlabel("Score")
+    _draw_histogram(axes[1], data["comments"], "blue")
+    axes[1].set_title("Comment Count Distribution")
+    axes[1].set_xlabel("Number of Comments")
+    fig.suptitle("Distributions of Post Score(Upvotes) and Comment Count", fontsize=16)
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+
+# === Step 5: Sentiment ===
+def histogram(plt, hist, title, color="royalblue", xlabel=None):
+    plt.figure(figsize=(10, 6))
+    _draw_histogram(plt.gca(), hist, color)
+    plt.axvline(0, color="gray", linestyle="--")
+    plt.title(title)
+    if xlabel:
+        plt.xlabel(xlabel)
+    plt.tight_layout()
+
+
+def subreddit_bars(plt, data, col, title, palette, xlabel=None, figsize=(10, 6)):
+    plt.figure(figsize=figsize)
+    load_seaborn().barplot(x=col, y="Subreddit", data=data, order=data["Subreddit"], palette=palette)
+    plt.title(title)
+    if xlabel:
+        plt.xlabel(xlabel)
+    plt.tight_layout()
+
+
+def sentiment_scatter(plt, data):
+    plt.figure(figsize=(8, 6))
+    load_seaborn().scatterplot(x=data["x"], y=data["y"], alpha=0.5)
+    plt.axhline(0, color="gray", linestyle="--")
+    plt.axvline(0, color="gray", linestyle="--")
+    plt.xlabel("Post Sentiment")
+    plt.ylabel("Comment Sentiment")
+    plt.title("Post vs Comment Sentiment")
+    plt.tight_layout()
+
+
+def search_term_lines(plt, term_avg):
+    plt.figure(figsize=(12, 6))
+    x_pos = range(len(term_avg))
+    plt.plot(x_pos, term_avg["Post_compound"], label="Post", marker="o", color="royalblue")
+    plt.plot(x_pos, term_avg["Comment_compound"], label="Comment", marker="o", color="orange")
+    plt.xticks(x_pos, term_avg["Search_Term"], rotation=45, ha="right")
+    plt.title("Sentiment by Search Term")
+    plt.ylabel("Average Compound Sentiment")
+    plt.grid(True, linestyle="--", alpha=0.5)
+    plt.legend()
+    plt.tight_layout()
+
+
+def label_pie(plt, counts, title, colors):
+    plt.figure(figsize=(5, 5))
+    counts.plot.pie(autopct="%1.1f%%", colors=[colors.get(label, "blue") for label in counts.index])
+    plt.title(title)
+    plt.ylabel("")
+    plt.tight_layout()
+
+
+def series_barh(plt, series, title, xlabel, color="teal"):
+    plt.figure(figsize=(12, 8))
+    series.plot(kind="barh", color=color)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.tight_layout()
+
+
+def subreddit_scatter(plt, data):
+    plt.figure(figsize=(8, 6))
+    load_seaborn().scatterplot(
+        data=data, x="Post_compound", y="Comment_compound", hue="Subreddit", legend=False, alpha=0.7
+    )
+    plt.axhline(0, color="gray", linestyle="--")
+    plt.axvline(0, color="gray", linestyle="--")
+    plt.title("Subreddit-Level: Post vs Comment Sentiment")
+    plt.xlabel("Avg Post Sentiment")
+    plt.ylabel("Avg Comment Sentiment")
+    plt.tight_layout()
+
+
+# === Step 7: Sentiment x Topic Overlay ===
+def sentiment_overlay(plt, sentiment_percent, colors):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bottom = [0] * len(sentiment_percent)
+
+    for sentiment in ["Negative", "Neutral", "Positive"]:
+        values = sentiment_percent[sentiment].values
+        bars = ax.bar(
+            sentiment_percent.index,
+            values,
+            bottom=bottom,
+            color=colors[sentiment],
+            edgecolor="black",
+            label=sentiment,
+        )
+        for bar, val in zip(bars, values):
+            if val > 0.05:
+                ax.text(
+                    bar.get_x() + bar.get_width() / 2,
+                    bar.get_y() + val / 2,
+                    sentiment,
+                    ha="center",
+                    va="center",
+                    fontsize=9,
+                    color="white" if sentiment != "Neutral" else "black",
+                    weight="bold",
+                )
+        bottom = [i + j for i, j in zip(bottom, values)]
+
+    ax.set_title("Sentiment Overlay by Topic", fontsize=16, weight="bold")
+    ax.set_ylabel("Proportion of Sentiment", fontsize=13)
+    ax.set_xlabel("Topic", fontsize=13)
+    ax.set_ylim(0, 1.0)
+    ax.set_xticks(range(len(sentiment_percent)))
+    ax.set_xticklabels(sentiment_percent.index, rotation=30, ha="right", fontsize=11)
+    ax.tick_params(axis="y", labelsize=11)
+    ax.grid(axis="y", linestyle="--", linewidth=0.5, alpha=0.7)
+    ax.legend().remove()
+    plt.tight_layout()
@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from post_schema import text_dtype
+
+# === CONFIG ===
+COMMENTS_FILE = "Reddit/results/reddit_social_media_ban_comments.csv"
+# How step1 joins the top comments into a post's Top_Comments cell
+BLOB_SEPARATOR = "\n---\n"
+
+
+# === Comments Table ===
+# One row per comment (Post_ID, Comment_ID, Parent_ID, Score, Depth,
+# Created_Epoch, Body), as written by step1
+def load_comments(path=COMMENTS_FILE):
+    text = text_dtype()
+    comments = pd.read_csv(
+        path, dtype={"Post_ID": text, "Comment_ID": text, "Parent_ID": text, "Body": text}
+    )
+    for col in ["Score", "Depth", "Created_Epoch"]:
+        if col in comments.columns and pd.api.types.is_integer_dtype(comments[col].dtype):
+            comments[col] = pd.to_numeric(comments[col], downcast="integer")
+    comments["Body"] = comments["Body"].fillna("")
+    return comments
+
+
+# Top_Comments cells split back into comments: (comments, position of each
+# comment's row in `top_comments`), depth 0 and no comment scores
+def split_top_comments(top_comments):
+    bodies = pd.Series(top_comments).astype(object).fillna("").str.split(BLOB_SEPARATOR)
+    bodies.index = np.arange(len(bodies))
+    bodies = bodies.explode()
+    bodies = bodies[bodies.str.strip() != ""]
+    comments = pd.DataFrame(
+        {"Body": bodies.to_numpy(), "Score": np.nan, "Depth": np.zeros(len(bodies), dtype=np.int8)}
+    )
+    return comments, bodies.index.to_numpy(dtype=np.int64)
+
+
+# Returns (comments, codes, row_segments): the comments belonging to `posts`,
+# each comment's segment code, and each post row's segment. Posts sharing a
+# Post_ID share a segment. Rows without a Post_ID, and whole corpora scraped
+# before the comments table existed, fall back to splitting Top_Comments,
+# with one segment per such row.
+def comment_segments(posts, path=COMMENTS_FILE):
+    if not (os.path.exists(path) and "Post_ID" in posts.columns):
+        comments, codes = split_top_comments(posts["Top_Comments"])
+        return comments, codes, np.arange(len(posts))
+
+    row_segments, post_ids = pd.factorize(posts["Post_ID"])
+    comments = load_comments(path)
+    codes = post_ids.get_indexer(comments["Post_ID"])
+    keep = codes >= 0
+    comments, codes = comments[keep].reset_index(drop=True), codes[keep]
+
+    orphans = np.flatnonzero(row_segments < 0)
+    if len(orphans):
+        split, positions = split_top_comments(posts["Top_Comments"].iloc[orphans])
+        row_segments[orphans] = len(post_ids) + np.arange(len(orphans))
+        comments = pd.concat([comments, split], ignore_index=True)
+        codes = np.concatenate([codes, row_segments[orphans[positions]]])
+    return comments, codes, row_segments
+
+
+# === Ragged Arrays ===
+# A ragged array is one flat value array ordered by segment plus offsets:
+# segment i holds values[offsets[i]:offsets[i + 1]]. `order` puts values into
+# that layout; a stable sort keeps each post's comments in table order.
+def ragged_offsets(codes, n_segments):
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind="stable")
+    sizes = np.bincount(codes, minlength=n_segments)
+    return order, np.concatenate([[0], np.cumsum(sizes)])
+
+
+# Count, mean, min, max and sample std of every segment in one pass each;
+# empty segments get NaN (count 0)
+def segment_stats(values, offsets):
+    values = np.asarray(values, dtype=np.float64)
+    sizes = np.diff(offsets)
+    filled = sizes > 0
+    stats = {name: np.full(len(sizes), np.nan) for name in ["mean", "min", "max", "std"]}
+    stats["n"] = sizes
+    if not filled.any():
+        return stats
+
+    starts = offsets[:-1]
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cumsum[offsets[1:]] - cumsum[starts]) / sizes
+        # Two-pass variance: squared deviations from each segment's own mean
+        dev = values - np.repeat(mean, sizes)
+        sq = np.concatenate([[0.0], np.cumsum(dev * dev)])
+        var = (sq[offsets[1:]] - sq[starts]) / (sizes - 1)
+    stats["mean"] = np.where(filled, mean, np.nan)
+    stats["std"] = np.where(sizes > 1, np.sqrt(np.maximum(var, 0)), np.nan)
+    # reduceat over the non-empty starts only: an empty segment in between
+    # adds no values to its neighbour's range
+    stats["min"][filled] = np.minimum.reduceat(values, starts[filled])
+    stats["max"][filled] = np.maximum.reduceat(values, starts[filled])
+    return stats
+
+
+# Per-post aggregates of each comment-level column in `comments`, aligned to
+# the post rows: Comments_N plus Comments_<col>_<mean|min|max|std>
+def per_post_stats(comments, codes, row_segments, columns):
+    n_segments = int(row_segments.max()) + 1 if len(row_segments) else 0
+    order, offsets = ragged_offsets(codes, n_segments)
+    out = {}
+    for col in columns:
+        stats = segment_stats(comments[col].to_numpy(dtype=np.float64)[order], offsets)
+        out.setdefault("Comments_N", stats.pop("n"))
+        for name, values in stats.items():
+            out[f"Comments_{col}_{name}"] = values
+
+    frame = pd.DataFrame(out)
+    # Rows without a Post_ID (-1) have no comments
+    missing = row_segments < 0
+    frame = frame.reindex(np.where(missing, 0, row_segments)).reset_index(drop=True)
+    frame.loc[missing, :] = np.nan
+    frame.loc[missing, "Comments_N"] = 0
+    frame["Comments_N"] = frame["Comments_N"].astype(np.int32)
+    return frame
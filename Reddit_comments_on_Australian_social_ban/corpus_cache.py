@@ -0,0 +1,160 @@
+import hashlib
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# === CONFIG ===
+CACHE_FOLDER = "Reddit/results/corpus_cache"
+
+
+# === Tokenized Corpus ===
+# Each document is tokenized exactly once and stored as a ragged array of
+# term ids (indptr/ids, like a CSR row layout), with term ids assigned in
+# order of first occurrence. A CSR doc x term count matrix and one row of
+# metadata per document (post URL, subreddit, search term) sit alongside.
+class CorpusCache:
+    def __init__(self, indptr, ids, vocab, meta, source_hash=""):
+        self.indptr = indptr
+        self.ids = ids
+        self.vocab = vocab
+        self.meta = meta
+        self.source_hash = source_hash
+        self._doc_term = None
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def doc_term(self):
+        if self._doc_term is None:
+            self._doc_term = sparse.csr_matrix(
+                (np.ones(len(self.ids), dtype=np.int32), self.ids, self.indptr),
+                shape=(len(self), len(self.vocab)),
+                copy=True,
+            )
+            self._doc_term.sum_duplicates()
+        return self._doc_term
+
+    def token_lists(self):
+        vocab = np.asarray(self.vocab, dtype=object)
+        return [vocab[self.ids[a:b]].tolist() for a, b in zip(self.indptr[:-1], self.indptr[1:])]
+
+    # Term counts per group are one sparse product (group indicator @ doc x
+    # term). Ties are broken by where the term first appears within the group,
+    # matching a Counter fed the group's documents in order.
+    def top_terms(self, k=20, group_col=None):
+        n_docs = len(self)
+        if group_col is None:
+            codes, groups = np.zeros(n_docs, dtype=np.int64), np.array([None])
+        else:
+            codes, groups = pd.factorize(self.meta[group_col], sort=True)
+        valid = codes >= 0
+        indicator = sparse.csr_matrix(
+            (np.ones(valid.sum()), (codes[valid], np.flatnonzero(valid))),
+            shape=(len(groups), n_docs),
+        )
+        counts = (indicator @ self.doc_term).tocsr()
+
+        token_groups = np.repeat(codes, np.diff(self.indptr))
+        keep = token_groups >= 0
+        keys = token_groups[keep] * len(self.vocab) + self.ids[keep]
+        unique_keys, first_pos = np.unique(keys, return_index=True)
+
+        result = {}
+        for g, group in enumerate(groups):
+            start, end = counts.indptr[g], counts.indptr[g + 1]
+            terms, values = counts.indices[start:end], counts.data[start:end]
+            first = first_pos[np.searchsorted(unique_keys, g * len(self.vocab) + terms)]
+            order = np.lexsort((first, -values))[:k]
+            result[group] = [(self.vocab[terms[i]], int(values[i])) for i in order]
+        return result[None] if group_col is None else result
+
+
+# === Build / Load ===
+# The key covers the texts, their metadata rows and the analyzer, so a cache
+# is rebuilt when a post's subreddit/search term changes or the tokenizer's
+# code does, not only when the text does
+def source_hash(texts, analyzer_name, meta=None):
+    digest = hashlib.sha256(analyzer_name.encode("utf-8"))
+    for text in texts:
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\0")
+    if meta is not None:
+        digest.update(repr(list(meta.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(meta, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Analyzer identity from the source of the functions/classes that tokenize
+def analyzer_identity(*analyzers):
+    digest = hashlib.sha256()
+    for analyzer in analyzers:
+        digest.update(inspect.getsource(analyzer).encode("utf-8"))
+    names = ", ".join(a.__qualname__ for a in analyzers)
+    return f"{names}@{digest.hexdigest()[:16]}"
+
+
+def build_corpus_cache(token_lists, meta, source_hash=""):
+    token2id = {}
+    lengths = np.zeros(len(token_lists), dtype=np.int64)
+    ids = []
+    for i, tokens in enumerate(token_lists):
+        lengths[i] = len(tokens)
+        ids.extend(token2id.setdefault(t, len(token2id)) for t in tokens)
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    return CorpusCache(
+        indptr, np.asarray(ids, dtype=np.int32), list(token2id), meta.reset_index(drop=True), source_hash
+    )
+
+
+def cache_paths(name, folder=CACHE_FOLDER):
+    base = os.path.join(folder, name)
+    return {
+        "tokens": f"{base}_tokens.npz",
+        "doc_term": f"{base}_doc_term.npz",
+        "vocab": f"{base}_vocab.txt",
+        "meta": f"{base}_meta.csv",
+    }
+
+
+def save_corpus_cache(cache, name, folder=CACHE_FOLDER):
+    os.makedirs(folder, exist_ok=True)
+    paths = cache_paths(name, folder)
+    np.savez(paths["tokens"], indptr=cache.indptr, ids=cache.ids, source_hash=cache.source_hash)
+    sparse.save_npz(paths["doc_term"], cache.doc_term)
+    with open(paths["vocab"], "w", encoding="utf-8") as f:
+        f.writelines(f"{term}\n" for term in cache.vocab)
+    cache.meta.to_csv(paths["meta"], index=False)
+
+
+def load_corpus_cache(name, folder=CACHE_FOLDER):
+    paths = cache_paths(name, folder)
+    if not all(os.path.exists(p) for p in paths.values()):
+        return None
+    arrays = np.load(paths["tokens"])
+    with open(paths["vocab"], encoding="utf-8") as f:
+        vocab = f.read().splitlines()
+    cache = CorpusCache(
+        arrays["indptr"], arrays["ids"], vocab, pd.read_csv(paths["meta"]), str(arrays["source_hash"])
+    )
+    cache._doc_term = sparse.load_npz(paths["doc_term"])
+    return cache
+
+
+# Loads the named cache when it was built from exactly these texts and meta
+# rows with this analyzer; otherwise tokenizes them once (tokenize_many: texts -> token
+# lists) and persists the result for every later step and run.
+def cached_corpus(name, texts, tokenize_many, meta, analyzer_name=None, folder=CACHE_FOLDER):
+    texts = list(texts)
+    digest = source_hash(texts, analyzer_name or name, meta)
+    cache = load_corpus_cache(name, folder)
+    if cache is not None and cache.source_hash == digest:
+        print(f"[✓] Reusing tokenized corpus '{name}' ({len(cache)} docs, {len(cache.vocab)} terms)")
+        return cache
+    cache = build_corpus_cache(tokenize_many(texts), meta, digest)
+    save_corpus_cache(cache, name, folder)
+    print(f"[✓] Tokenized corpus '{name}' cached to {folder} ({len(cache)} docs, {len(cache.vocab)} terms)")
+    return cache
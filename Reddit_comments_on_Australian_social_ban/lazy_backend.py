@@ -0,0 +1,175 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from post_schema import CATEGORY_COLUMNS, TEXT_COLUMNS, compact
+
+# === CONFIG ===
+# Engine for the step2 filter chain and step7 joins: "pandas" (eager, the
+# reference) or "polars" (lazy scans with predicate and projection pushdown,
+# multithreaded). --engine overrides it per run. Step 5 is pandas only: its
+# aggregates run over VADER scores computed in memory, so there is no file
+# for a lazy scan to push anything down to.
+ENGINES = ["pandas", "polars"]
+PIPELINE_ENGINE = os.environ.get("PIPELINE_ENGINE", "pandas")
+# Strings read_csv turns into NaN by default; polars is given the same list
+# so both engines see the same missing values
+PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+# Shared by both step2 engines: titles dropped as placeholders, and the
+# filter_stats keys in the order the filters run
+PLACEHOLDER_TITLES = ["[deleted]", "[removed]", ""]
+STAGE2_STATS = [
+    "initial", "placeholder_removed", "date_filtered", "score_filtered", "length_filtered",
+    "lang_filtered", "author_filtered", "empty_body_filtered", "profanity_flagged",
+]
+
+
+def polars_available():
+    return importlib.util.find_spec("polars") is not None
+
+
+def add_engine_argument(parser):
+    parser.add_argument(
+        "--engine", choices=ENGINES, default=PIPELINE_ENGINE,
+        help="dataframe engine for filters, joins and aggregates (default: $PIPELINE_ENGINE or pandas)",
+    )
+    return parser
+
+
+# Falls back to pandas when polars is not installed
+def resolve_engine(engine):
+    if engine == "polars" and not polars_available():
+        print("[⚠] polars is not installed; using the pandas engine")
+        return "pandas"
+    print(f"[engine] {engine}")
+    return engine
+
+
+# === Scanning ===
+# Lazy scan of a post CSV: text and label columns stay strings, every other
+# column type is inferred from the whole file. Nothing is read until collect,
+# and only the columns the query uses are parsed.
+def scan_posts(path):
+    import polars as pl
+
+    header = pd.read_csv(path, nrows=0).columns
+    overrides = {col: pl.String for col in TEXT_COLUMNS + CATEGORY_COLUMNS if col in header}
+    return pl.scan_csv(
+        path, schema_overrides=overrides, null_values=PANDAS_NA_VALUES, infer_schema_length=None
+    )
+
+
+# Collected polars frame -> pandas frame with the post_schema dtypes
+def to_posts(frame):
+    return compact(frame.to_pandas())
+
+
+# === Step 2: Filter Chain ===
+# Sort by score (stable, missing scores last), keep the first row per URL and
+# drop posts whose Title + Selftext is too short. str() of a missing value is
+# "nan" in the pandas path, so missing text counts as three characters here too.
+def stage1_polars(path, min_length):
+    import polars as pl
+
+    text_len = sum(pl.col(col).fill_null("nan").str.len_chars() for col in ["Title", "Selftext"])
+    return (
+        scan_posts(path)
+        .sort("Score", descending=True, nulls_last=True, maintain_order=True)
+        .unique(subset="URL", keep="first", maintain_order=True)
+        .filter(text_len > min_length)
+        .collect()
+    )
+
+
+# Stage 2 filters and their filter_stats counts. The cheap predicates are
+# evaluated together in one pass; language detection only runs on the rows
+# that survive them.
+def stage2_polars(stage1, date_cutoff, score_threshold, min_length, is_english, profanity_words):
+    import polars as pl
+
+    # Missing epochs fall back to Created_UTC per row, as in the pandas path
+    created = pl.col("Created_UTC").str.to_datetime(time_unit="us", strict=False)
+    if "Created_Epoch" in stage1.columns:
+        created = pl.from_epoch("Created_Epoch", time_unit="s").cast(pl.Datetime("us")).fill_null(created)
+    combined = pl.col("Title").fill_null("") + " " + pl.col("Selftext").fill_null("")
+    placeholder = pl.col("Title").str.strip_chars().str.to_lowercase().is_in(PLACEHOLDER_TITLES)
+
+    checks = stage1.lazy().with_columns(Created_Date=created, combined_text=combined).with_columns(
+        _placeholder=placeholder.fill_null(False).not_(),
+        _date=(pl.col("Created_Date") >= pl.lit(date_cutoff.to_pydatetime())).fill_null(False),
+        _score=(pl.col("Score") >= score_threshold).fill_null(False),
+        _length=pl.col("combined_text").str.len_chars() >= min_length,
+    )
+    passed = pl.lit(True)
+    counts = {}
+    for name, flag in [
+        ("placeholder_removed", "_placeholder"), ("date_filtered", "_date"),
+        ("score_filtered", "_score"), ("length_filtered", "_length"),
+    ]:
+        counts[name] = (passed & pl.col(flag).not_()).sum()
+        passed = passed & pl.col(flag)
+    stats_frame, df = pl.collect_all([
+        checks.select(initial=pl.len(), **counts),
+        checks.filter(passed).drop(["_placeholder", "_date", "_score", "_length"]),
+    ])
+    stats = {k: int(v) for k, v in stats_frame.row(0, named=True).items()}
+
+    english = pl.Series([is_english(text) for text in df["combined_text"]], dtype=pl.Boolean)
+    stats["lang_filtered"] = int((~english).sum())
+    df = df.filter(english).with_columns(Created_Epoch=pl.col("Created_Date").dt.epoch("s"))
+
+    author_ok = pl.col("Author").is_not_null() & (pl.col("Author").str.to_lowercase() != "none")
+    body_ok = pl.col("Selftext").fill_null("").str.strip_chars() != ""
+    before = len(df)
+    df = df.filter(author_ok)
+    stats["author_filtered"] = before - len(df)
+    before = len(df)
+    df = df.filter(body_ok)
+    stats["empty_body_filtered"] = before - len(df)
+
+    df = df.with_columns(
+        Profanity_Flag=pl.col("combined_text").str.to_lowercase().str.contains_any(profanity_words)
+    ).drop("combined_text")
+    stats["profanity_flagged"] = int(df["Profanity_Flag"].sum())
+    return df, {name: stats[name] for name in STAGE2_STATS}
+
+
+# === Step 7: Joins and Crosstabs ===
+# Inner join of every sentiment column with Dominant_Topic on Full_Text, in
+# pandas merge order (left rows first, then right matches); only the two
+# topic columns are parsed from the topic file
+def merge_polars(sentiment_path, topic_path):
+    merged = scan_posts(sentiment_path).join(
+        scan_posts(topic_path).select(["Full_Text", "Dominant_Topic"]),
+        on="Full_Text", how="inner", nulls_equal=True, maintain_order="left_right",
+    )
+    return to_posts(merged.collect())
+
+
+# Topic posts left-joined to their sentiment label and compound, plus the
+# topic x label count table (groupby(...).size().unstack() in pandas)
+def overlay_polars(topic_path, sentiment_path):
+    import polars as pl
+
+    topics = scan_posts(topic_path)
+    topic_cols = [c for c in ["Full_Text", "Dominant_Topic", "Doc_Topic_Row"] if c in topics.collect_schema()]
+    joined = topics.select(topic_cols).join(
+        scan_posts(sentiment_path).select(["Full_Text", "Full_Label", "Full_compound"]),
+        on="Full_Text", how="left", nulls_equal=True, maintain_order="left_right",
+    )
+    counts = (
+        joined.filter(pl.col("Dominant_Topic").is_not_null() & pl.col("Full_Label").is_not_null())
+        .group_by(["Dominant_Topic", "Full_Label"])
+        .agg(pl.len().cast(pl.Int64).alias("len"))
+    )
+    df, counts = pl.collect_all([joined, counts])
+
+    counts = counts.to_pandas().pivot(index="Dominant_Topic", columns="Full_Label", values="len")
+    counts = counts.sort_index().reindex(columns=np.sort(counts.columns.to_numpy()))
+    counts.columns.name = "Full_Label"
+    return to_posts(df), counts
@@ -0,0 +1,88 @@
+import os
+
+from gensim import corpora
+
+# === CONFIG ===
+BASE_FOLDER = "Reddit/results/topic_modeling"
+TOKENS_PATH = os.path.join(BASE_FOLDER, "lda_tokens.txt")
+DOC_IDS_PATH = os.path.join(BASE_FOLDER, "lda_doc_ids.txt")
+DICTIONARY_PATH = os.path.join(BASE_FOLDER, "lda_dictionary.gensim")
+CORPUS_PATH = os.path.join(BASE_FOLDER, "lda_corpus.mm")
+
+NO_BELOW = 5
+NO_ABOVE = 0.5
+
+
+# === Token Stream ===
+# One document per line, tokens separated by single spaces. The normalizer
+# only emits [a-z]+ tokens, so no escaping is needed, and empty documents stay
+# as empty lines. A parallel file holds each document's post URL, so corpus
+# rows can be joined back to the post table after incremental appends.
+def write_tokens(token_lists, doc_ids, path=TOKENS_PATH, ids_path=DOC_IDS_PATH, append=False):
+    mode = "a" if append else "w"
+    with open(path, mode, encoding="utf-8") as f, open(ids_path, mode, encoding="utf-8") as g:
+        for tokens, doc_id in zip(token_lists, doc_ids):
+            f.write(" ".join(tokens) + "\n")
+            g.write(f"{doc_id}\n")
+
+
+def read_doc_ids(path=DOC_IDS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+class TokenStream:
+    def __init__(self, path=TOKENS_PATH):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                yield line.split()
+
+
+# === Dictionary + Bag-of-Words Corpus ===
+# Built once from the token stream and persisted; the corpus is serialized as
+# a Matrix Market file with an offset index, so later steps iterate it from
+# disk (or seek to single documents) without loading it.
+def build_dictionary(tokens_path=TOKENS_PATH, no_below=NO_BELOW, no_above=NO_ABOVE):
+    dictionary = corpora.Dictionary(TokenStream(tokens_path))
+    dictionary.filter_extremes(no_below=no_below, no_above=no_above)
+    return dictionary
+
+
+def build_corpus(
+    tokens_path=TOKENS_PATH,
+    dictionary_path=DICTIONARY_PATH,
+    corpus_path=CORPUS_PATH,
+    no_below=NO_BELOW,
+    no_above=NO_ABOVE,
+):
+    dictionary = build_dictionary(tokens_path, no_below, no_above)
+    dictionary.save(dictionary_path)
+    serialize_corpus(dictionary, tokens_path, corpus_path)
+    return dictionary
+
+
+def serialize_corpus(dictionary, tokens_path=TOKENS_PATH, corpus_path=CORPUS_PATH):
+    corpora.MmCorpus.serialize(corpus_path, BowStream(dictionary, tokens_path), id2word=dictionary)
+
+
+# Re-iterable bag-of-words view over the token log, for models trained
+# against a dictionary that has not been serialized to a corpus file.
+class BowStream:
+    def __init__(self, dictionary, tokens_path=TOKENS_PATH):
+        self.dictionary = dictionary
+        self.tokens_path = tokens_path
+
+    def __iter__(self):
+        for tokens in TokenStream(self.tokens_path):
+            yield self.dictionary.doc2bow(tokens)
+
+
+def load_dictionary(path=DICTIONARY_PATH):
+    return corpora.Dictionary.load(path)
+
+
+def load_corpus(path=CORPUS_PATH):
+    return corpora.MmCorpus(path)
@@ -0,0 +1,39 @@
+import numpy as np
+
+# === CONFIG ===
+INFER_CHUNK_SIZE = 2000
+
+
+# === Batched Topic Inference ===
+# Runs the variational E-step on INFER_CHUNK_SIZE documents at a time and
+# normalizes gamma into topic mixtures, the same quantity get_document_topics
+# returns per document (without its minimum-probability cut-off). Backends
+# from topic_backends provide their own topic_mixtures and are used as-is.
+def infer_topic_mixtures(lda_model, bows):
+    if hasattr(lda_model, "topic_mixtures"):
+        return lda_model.topic_mixtures(bows)
+    if not bows:
+        return np.zeros((0, lda_model.num_topics), dtype=np.float32)
+    gamma, _ = lda_model.inference(bows)
+    return (gamma / gamma.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+# Streams the corpus once and writes the dense doc x topic matrix straight
+# into a memory-mapped .npy, so only one chunk of mixtures is in RAM.
+def write_doc_topic_matrix(lda_model, corpus, path, chunk_size=INFER_CHUNK_SIZE):
+    doc_topics = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float32, shape=(len(corpus), lda_model.num_topics)
+    )
+    row, chunk = 0, []
+    for bow in corpus:
+        chunk.append(bow)
+        if len(chunk) == chunk_size:
+            doc_topics[row : row + len(chunk)] = infer_topic_mixtures(lda_model, chunk)
+            row, chunk = row + len(chunk), []
+    doc_topics[row : row + len(chunk)] = infer_topic_mixtures(lda_model, chunk)
+    doc_topics.flush()
+    return doc_topics
+
+
+def load_doc_topic_matrix(path):
+    return np.load(path, mmap_mode="r")
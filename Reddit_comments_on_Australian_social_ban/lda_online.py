@@ -0,0 +1,93 @@
+from collections import Counter
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from lda_corpus import TokenStream
+
+# === CONFIG ===
+# Vocabulary growth policy for online updates: a new term is admitted only if
+# it reaches the same document-frequency bounds filter_extremes applied at
+# training time, and at most MAX_NEW_TERMS terms are admitted per update
+# (highest document frequency first). Existing term ids never change.
+NEW_TERM_MIN_DF = 5
+NEW_TERM_MAX_DF_RATIO = 0.5
+MAX_NEW_TERMS = 2000
+
+
+# === Dictionary Growth ===
+def grow_dictionary(
+    dictionary,
+    new_docs,
+    tokens_path,
+    min_df=NEW_TERM_MIN_DF,
+    max_df_ratio=NEW_TERM_MAX_DF_RATIO,
+    max_new=MAX_NEW_TERMS,
+):
+    known = dictionary.token2id
+    candidates = {t for doc in new_docs for t in doc if t not in known}
+    if not candidates:
+        return []
+
+    # Document frequency over the full token log (old + new documents)
+    dfs, num_docs = Counter(), 0
+    for tokens in TokenStream(tokens_path):
+        num_docs += 1
+        dfs.update(candidates.intersection(tokens))
+
+    eligible = [
+        t for t in candidates if min_df <= dfs[t] <= max_df_ratio * num_docs
+    ]
+    admitted = sorted(eligible, key=lambda t: (-dfs[t], t))[:max_new]
+    allowed = set(known) | set(admitted)
+    dictionary.add_documents([[t for t in doc if t in allowed] for doc in new_docs])
+    return admitted
+
+
+# === Model Vocabulary Expansion ===
+# Pads the topic-word statistics of a trained LdaModel/LdaMulticore with
+# zero counts for the newly admitted term ids, so the next online update can
+# learn them. New terms start at the prior (eta) in every topic.
+def expand_model_vocabulary(lda_model, dictionary):
+    old_terms = lda_model.num_terms
+    n_new = len(dictionary) - old_terms
+    if n_new <= 0:
+        return 0
+
+    dtype = lda_model.dtype
+    eta = np.asarray(lda_model.eta, dtype=dtype)
+    pad_value = eta.mean()
+    pad_shape = eta.shape[:-1] + (n_new,)
+    lda_model.eta = np.concatenate([eta, np.full(pad_shape, pad_value, dtype=dtype)], axis=-1)
+
+    state = lda_model.state
+    state.eta = lda_model.eta
+    state.sstats = np.hstack(
+        [state.sstats, np.zeros((state.sstats.shape[0], n_new), dtype=state.sstats.dtype)]
+    )
+    lda_model.num_terms = len(dictionary)
+    lda_model.id2word = dictionary
+    lda_model.sync_state()
+    return n_new
+
+
+# === Topic Drift ===
+# Topics from two models are compared on the union of their vocabularies
+# (by token, so different dictionaries are fine), matched one-to-one with
+# the Hungarian algorithm on Hellinger distance.
+def topic_drift(model_a, model_b):
+    vocab = sorted(set(model_a.id2word.token2id) | set(model_b.id2word.token2id))
+    index = {t: i for i, t in enumerate(vocab)}
+
+    def aligned(model):
+        topics = model.get_topics()
+        out = np.zeros((topics.shape[0], len(vocab)))
+        cols = [index[model.id2word[i]] for i in range(topics.shape[1])]
+        out[:, cols] = topics
+        return np.sqrt(out / out.sum(axis=1, keepdims=True))
+
+    a, b = aligned(model_a), aligned(model_b)
+    # Hellinger: sqrt(1 - Bhattacharyya coefficient) on the sqrt-distributions
+    dist = np.sqrt(np.clip(1 - a @ b.T, 0, None))
+    rows, cols = linear_sum_assignment(dist)
+    return list(zip(rows.tolist(), cols.tolist(), dist[rows, cols].tolist()))
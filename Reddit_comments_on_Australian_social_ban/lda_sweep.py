@@ -0,0 +1,161 @@
+import glob
+import itertools
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from gensim import matutils
+from gensim.models import LdaModel
+from scipy import sparse
+
+from lda_corpus import BASE_FOLDER, CORPUS_PATH, DICTIONARY_PATH, load_corpus, load_dictionary
+
+# === CONFIG ===
+SWEEP_FOLDER = os.path.join(BASE_FOLDER, "sweep")
+COOCCURRENCE_PATH = os.path.join(SWEEP_FOLDER, "doc_term_binary.npz")
+LEADERBOARD_CSV = os.path.join(SWEEP_FOLDER, "lda_sweep_leaderboard.csv")
+LEADERBOARD_MD = os.path.join(SWEEP_FOLDER, "lda_sweep_leaderboard.md")
+BEST_MODEL_PATH = os.path.join(SWEEP_FOLDER, "lda_sweep_best.gensim")
+
+SWEEP_GRID = {
+    "num_topics": [4, 5, 6, 8, 10],
+    "alpha": ["symmetric", "asymmetric", "auto"],
+    "eta": [None, "auto"],
+    # Passes are the successive-halving rungs: every configuration is scored
+    # after the first value, and only the best 1/HALVING_FACTOR go on. A
+    # promoted model is continued from its checkpoint for the extra passes,
+    # never retrained from scratch.
+    "passes": [2, 5, 10],
+}
+HALVING_FACTOR = 2
+COHERENCE_TOPN = 20
+SWEEP_WORKERS = None
+SEED = 42
+EPSILON = 1e-12
+
+
+# === Shared Co-occurrence Index ===
+# Binary doc x term matrix (CSC) built once from the persisted corpus. Any
+# model's u_mass needs only the document frequencies and co-document
+# frequencies of its top words, i.e. X[:, ids].T @ X[:, ids].
+def build_cooccurrence_index(corpus_path=CORPUS_PATH, path=COOCCURRENCE_PATH):
+    corpus = load_corpus(corpus_path)
+    term_doc = matutils.corpus2csc(corpus, num_docs=len(corpus))
+    doc_term = (term_doc.T > 0).astype(np.int32).tocsc()
+    sparse.save_npz(path, doc_term)
+    return doc_term
+
+
+# Same definition as gensim's u_mass (one-preceding segmentation, log
+# conditional probability with EPSILON smoothing, mean over pairs then topics)
+def umass_coherence(topic_top_ids, doc_term):
+    num_docs = doc_term.shape[0]
+    scores = []
+    for ids in topic_top_ids:
+        sub = doc_term[:, ids]
+        co = (sub.T @ sub).toarray() / num_docs
+        df = np.diag(co)
+        rows, cols = np.tril_indices(len(ids), k=-1)
+        scores.append(np.mean(np.log((co[rows, cols] + EPSILON) / df[cols])))
+    return float(np.mean(scores))
+
+
+def top_ids(lda_model, topn=COHERENCE_TOPN):
+    return [
+        [word_id for word_id, _ in lda_model.get_topic_terms(k, topn=topn)]
+        for k in range(lda_model.num_topics)
+    ]
+
+
+# === Workers ===
+_corpus = _dictionary = _doc_term = None
+
+
+def _init_worker():
+    global _corpus, _dictionary, _doc_term
+    _corpus = load_corpus(CORPUS_PATH)
+    _dictionary = load_dictionary(DICTIONARY_PATH)
+    _doc_term = sparse.load_npz(COOCCURRENCE_PATH)
+
+
+# Trains a configuration up to params["passes"]: from scratch on the first
+# rung, else by continuing the checkpoint left at `done` passes with the
+# missing ones. The model is checkpointed again for the next rung.
+def _train_candidate(task):
+    params, checkpoint, done = task
+    start = time.perf_counter()
+    if done:
+        lda_model = LdaModel.load(checkpoint)
+        lda_model.update(_corpus, passes=params["passes"] - done)
+    else:
+        lda_model = LdaModel(
+            corpus=_corpus,
+            id2word=_dictionary,
+            num_topics=params["num_topics"],
+            alpha=params["alpha"],
+            eta=params["eta"],
+            passes=params["passes"],
+            random_state=SEED,
+        )
+    elapsed = time.perf_counter() - start
+    score = umass_coherence(top_ids(lda_model), _doc_term)
+    lda_model.save(checkpoint)
+    return {**params, "u_mass": score, "train_seconds": elapsed, "model_path": checkpoint}
+
+
+def _remove_model(path):
+    for src in glob.glob(path + "*"):
+        os.remove(src)
+
+
+# === Successive-Halving Sweep ===
+def run_sweep(grid=SWEEP_GRID, workers=SWEEP_WORKERS):
+    os.makedirs(SWEEP_FOLDER, exist_ok=True)
+    build_cooccurrence_index()
+
+    keys = [k for k in grid if k != "passes"]
+    configs = itertools.product(*(grid[k] for k in keys))
+    survivors = [
+        (dict(zip(keys, values)), os.path.join(SWEEP_FOLDER, f"candidate_{i}.gensim"))
+        for i, values in enumerate(configs)
+    ]
+    rungs = sorted(grid["passes"])
+    leaderboard = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        done = 0
+        for rung, passes in enumerate(rungs):
+            final = rung == len(rungs) - 1
+            tasks = [({**config, "passes": passes}, checkpoint, done) for config, checkpoint in survivors]
+            results = sorted(pool.map(_train_candidate, tasks), key=lambda r: -r["u_mass"])
+            keep = len(results) if final else max(1, math.ceil(len(results) / HALVING_FACTOR))
+            for position, result in enumerate(results):
+                result["rung"] = rung
+                result["status"] = "finalist" if final else ("promoted" if position < keep else "stopped")
+            leaderboard.extend(results)
+            print(f"[sweep] rung {rung} (passes={passes}, +{passes - done}): {len(results)} scored, {keep} kept")
+            for result in results[keep:]:
+                _remove_model(result["model_path"])
+            survivors = [({k: r[k] for k in keys}, r["model_path"]) for r in results[:keep]]
+            done = passes
+
+    # Keep the finalist with the best coherence; drop the other model files
+    best = results[0]
+    for src in glob.glob(best["model_path"] + "*"):
+        shutil.move(src, BEST_MODEL_PATH + src[len(best["model_path"]) :])
+    for result in results[1:]:
+        _remove_model(result["model_path"])
+
+    board = pd.DataFrame(leaderboard).drop(columns=["model_path"])
+    board["eta"] = board["eta"].fillna("symmetric")
+    board = board.sort_values(["rung", "u_mass"], ascending=[False, False])
+    board.to_csv(LEADERBOARD_CSV, index=False)
+    board.to_markdown(LEADERBOARD_MD, index=False)
+    print(f"[✓] Leaderboard saved to {LEADERBOARD_CSV}")
+    best_params = ", ".join(f"{k}={best[k]}" for k in keys + ["passes"])
+    print(f"[✓] Best model ({best_params}, u_mass {best['u_mass']:.4f}) saved to {BEST_MODEL_PATH}")
+    return board
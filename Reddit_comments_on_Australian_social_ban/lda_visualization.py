@@ -0,0 +1,112 @@
+import glob
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+from scipy.io import mmread
+
+from lda_corpus import BASE_FOLDER, CORPUS_PATH
+from lda_inference import load_doc_topic_matrix, write_doc_topic_matrix
+
+# === CONFIG ===
+PYLDAVIS_CACHE_FOLDER = os.path.join(BASE_FOLDER, "pyldavis_cache")
+# Keyword arguments passed to pyLDAvis.prepare; they are part of the cache key
+PREPARE_KWARGS = {"R": 30, "lambda_step": 0.01, "sort_topics": True}
+# Same floor pyLDAvis.gensim_models uses so no term has zero frequency
+MIN_TERM_FREQUENCY = 0.01
+HASH_BLOCK = 1 << 20
+
+
+# === Cache Key ===
+# sha256 over the bytes of the model files, the corpus and the doc x topic
+# matrix, plus the prepare() settings. Any retrain or online update changes it.
+def fingerprint(paths, settings):
+    digest = hashlib.sha256(repr(sorted(settings.items())).encode("utf-8"))
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# === Sparse Inputs ===
+# Builds the arrays pyLDAvis.gensim_models.prepare would derive, without
+# densifying the corpus: doc lengths and term frequencies are row/column sums
+# of the Matrix Market file read as a sparse matrix, topic-term probabilities
+# come straight from the model, and doc-topic mixtures from the persisted
+# doc x topic matrix (inferred and written if it is missing or stale).
+def pyldavis_inputs(lda_model, dictionary, doc_topic_path, corpus_path=CORPUS_PATH):
+    doc_term = mmread(corpus_path).tocsr()
+    doc_lengths = np.asarray(doc_term.sum(axis=1)).ravel()
+    term_frequency = np.zeros(len(dictionary))
+    counts = np.asarray(doc_term.sum(axis=0)).ravel()
+    term_frequency[: len(counts)] = counts
+    term_frequency[term_frequency == 0] = MIN_TERM_FREQUENCY
+
+    doc_topics = None
+    if os.path.exists(doc_topic_path):
+        doc_topics = load_doc_topic_matrix(doc_topic_path)
+    if doc_topics is None or doc_topics.shape != (doc_term.shape[0], lda_model.num_topics):
+        from lda_corpus import load_corpus
+
+        doc_topics = write_doc_topic_matrix(lda_model, load_corpus(corpus_path), doc_topic_path)
+
+    return {
+        "topic_term_dists": lda_model.get_topics(),
+        "doc_topic_dists": np.asarray(doc_topics, dtype=np.float64),
+        "doc_lengths": doc_lengths,
+        "vocab": [dictionary[i] for i in range(len(dictionary))],
+        "term_frequency": term_frequency,
+    }
+
+
+# === Cached Preparation ===
+def prepare_cached(lda_model, dictionary, model_path, doc_topic_path, corpus_path=CORPUS_PATH,
+                   cache_folder=PYLDAVIS_CACHE_FOLDER, **prepare_kwargs):
+    settings = {**PREPARE_KWARGS, **prepare_kwargs}
+    sources = sorted(glob.glob(model_path + "*")) + [corpus_path]
+    if os.path.exists(doc_topic_path):
+        sources.append(doc_topic_path)
+    key = fingerprint(sources, settings)
+    cache_path = os.path.join(cache_folder, f"prepared_{key[:16]}.pkl")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            prepared = pickle.load(f)
+        print(f"[✓] pyLDAvis data loaded from cache {cache_path}")
+        return prepared
+
+    import pyLDAvis
+
+    start = time.perf_counter()
+    inputs = pyldavis_inputs(lda_model, dictionary, doc_topic_path, corpus_path)
+    prepared = pyLDAvis.prepare(**inputs, **settings)
+    os.makedirs(cache_folder, exist_ok=True)
+    for stale in glob.glob(os.path.join(cache_folder, "prepared_*.pkl")):
+        os.remove(stale)
+    with open(cache_path, "wb") as f:
+        pickle.dump(prepared, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"[✓] pyLDAvis data prepared in {time.perf_counter() - start:.1f}s and cached to {cache_path}")
+    return prepared
+
+
+# === HTML Rendering ===
+# Rendering only serializes the prepared data, so label or styling changes
+# (topic_labels, pyLDAvis URL/template kwargs) never re-run prepare().
+def save_pyldavis_html(prepared, path, topic_labels=None, **html_kwargs):
+    import pyLDAvis
+
+    html = pyLDAvis.prepared_data_to_html(prepared, **html_kwargs)
+    if topic_labels:
+        # topic_order lists the model's topic ids (1-based) in display order
+        labels = dict(enumerate(topic_labels))
+        items = "".join(
+            f"<li>Topic {position}: {labels.get(topic_id - 1, f'LDA topic {topic_id - 1}')}</li>"
+            for position, topic_id in enumerate(prepared.topic_order, 1)
+        )
+        html = f"<ol style=\"list-style: none; font-family: sans-serif;\">{items}</ol>\n" + html
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
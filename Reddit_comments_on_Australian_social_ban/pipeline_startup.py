@@ -0,0 +1,77 @@
+import os
+import csv
+import time
+import argparse
+from datetime import datetime
+
+# Imported first by every step, so this is the cold-start reference point
+PROCESS_START = time.perf_counter()
+
+# === CONFIG ===
+STARTUP_LOG = "Reddit/results/startup_times.csv"
+
+
+# === CLI ===
+def step_arg_parser(description=None, plots=True):
+    parser = argparse.ArgumentParser(description=description)
+    if plots:
+        parser.add_argument(
+            "--no-plots",
+            action="store_true",
+            help="skip every chart and never import the plotting stack",
+        )
+    return parser
+
+
+# === Lazy Plotting Stack ===
+def load_pyplot():
+    import matplotlib
+
+    if not os.environ.get("DISPLAY") and not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def load_seaborn():
+    import seaborn as sns
+
+    return sns
+
+
+# === Offline NLTK Resources ===
+# Verifies resources are installed locally instead of calling nltk.download
+# (which hits the network on every run). Paths are nltk.data resource names,
+# e.g. "corpora/stopwords" or "sentiment/vader_lexicon.zip".
+def ensure_nltk_resources(*resources):
+    import nltk
+
+    missing = []
+    for resource in resources:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(resource)
+    if missing:
+        names = " ".join(os.path.basename(r).replace(".zip", "") for r in missing)
+        raise LookupError(
+            f"Missing NLTK resources: {', '.join(missing)}. "
+            f"Install them once with: python -m nltk.downloader {names}"
+        )
+
+
+# === Cold-Start Tracking ===
+# Appends how long the step took to get through its imports, so regressions
+# in startup time show up in startup_times.csv across runs.
+def record_startup(step, plots=True):
+    elapsed = time.perf_counter() - PROCESS_START
+    os.makedirs(os.path.dirname(STARTUP_LOG), exist_ok=True)
+    new_file = not os.path.exists(STARTUP_LOG)
+    with open(STARTUP_LOG, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["Timestamp", "Step", "Import_Seconds", "Plots"])
+        writer.writerow([datetime.now().isoformat(timespec="seconds"), step, f"{elapsed:.3f}", plots])
+    print(f"[startup] {step}: imports ready in {elapsed:.2f}s")
+    return elapsed
@@ -0,0 +1,111 @@
+import argparse
+import hashlib
+import sqlite3
+
+import pandas as pd
+
+# === CONFIG ===
+INDEX_PATH = "Reddit/results/preprocessing/post_index.sqlite"
+# Post table column -> index column
+INDEXED_COLUMNS = {
+    "Title": "title",
+    "Selftext": "selftext",
+    "Top_Comments": "comments",
+    "Search_Term": "search_term",
+}
+# The trigram tokenizer makes a quoted phrase match any case-insensitive
+# substring, the same semantics as str.contains(..., case=False)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, doc_hash TEXT NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5({", ".join(INDEXED_COLUMNS.values())}, tokenize='trigram');
+"""
+
+
+def fts5_available():
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def connect(path=INDEX_PATH):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# === Incremental Updates ===
+# Rows are keyed by URL with a hash of their indexed text: unseen URLs are
+# inserted, changed ones replaced, unchanged ones skipped. With prune=True,
+# URLs no longer in the table are dropped from the index.
+def update_index(df, path=INDEX_PATH, prune=False):
+    rows = df.drop_duplicates(subset="URL")
+    text = pd.DataFrame(
+        {col: rows[src].astype(object).fillna("").astype(str) if src in rows.columns else "" for src, col in INDEXED_COLUMNS.items()},
+        index=rows.index,
+    )
+    hashes = [
+        hashlib.sha1("\0".join(values).encode("utf-8")).hexdigest()
+        for values in text.itertuples(index=False)
+    ]
+
+    conn = connect(path)
+    existing = dict(conn.execute("SELECT url, doc_hash FROM docs"))
+    urls = rows["URL"].astype(str).tolist()
+    changed = [i for i, (url, h) in enumerate(zip(urls, hashes)) if existing.get(url) != h]
+    stale = [urls[i] for i in changed if urls[i] in existing]
+    if prune:
+        stale += list(existing.keys() - set(urls))
+
+    with conn:
+        for url in stale:
+            (doc_id,) = conn.execute("SELECT id FROM docs WHERE url = ?", (url,)).fetchone()
+            conn.execute("DELETE FROM post_fts WHERE rowid = ?", (doc_id,))
+            conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+        conn.executemany(
+            "INSERT INTO docs (url, doc_hash) VALUES (?, ?)", [(urls[i], hashes[i]) for i in changed]
+        )
+        ids = dict(conn.execute("SELECT url, id FROM docs"))
+        values = text.to_numpy()
+        conn.executemany(
+            f"INSERT INTO post_fts (rowid, {', '.join(text.columns)}) VALUES (?{', ?' * len(text.columns)})",
+            [(ids[urls[i]], *values[i]) for i in changed],
+        )
+    total = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    conn.close()
+    print(f"[✓] Post index updated: {len(changed)} indexed, {len(stale)} removed/replaced, {total} total")
+    return len(changed)
+
+
+# === Queries ===
+def phrase_query(terms):
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+# Returns matching URLs with a BM25 relevance score (higher = more relevant;
+# SQLite's bm25() is negated so it sorts the usual way). `columns` restricts
+# the match to those index columns.
+def search(query, columns=None, path=INDEX_PATH, limit=None):
+    match = f"{{{' '.join(columns)}}} : ({query})" if columns else query
+    sql = (
+        "SELECT d.url, -bm25(post_fts) FROM post_fts JOIN docs d ON d.id = post_fts.rowid "
+        "WHERE post_fts MATCH ? ORDER BY bm25(post_fts)"
+    )
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    conn = connect(path)
+    hits = pd.DataFrame(conn.execute(sql, (match,)).fetchall(), columns=["URL", "BM25"])
+    conn.close()
+    return hits
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local post index")
+    parser.add_argument("terms", nargs="+", help="phrases; a post matches if it contains any of them")
+    parser.add_argument("--columns", nargs="+", choices=list(INDEXED_COLUMNS.values()))
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    print(search(phrase_query(args.terms), args.columns, limit=args.limit).to_string(index=False))
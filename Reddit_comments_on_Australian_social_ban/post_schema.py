@@ -0,0 +1,68 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# === SCHEMA ===
+# Low-cardinality labels are stored as category codes, counts as the smallest
+# integer type that holds them, free text as Arrow-backed strings (one buffer
+# per column instead of a Python str object per cell) and flags as bool.
+# Columns missing from a file are skipped, so one schema covers every stage.
+CATEGORY_COLUMNS = ["Subreddit", "Search_Term", "Author"]
+INTEGER_COLUMNS = ["Score", "Num_Comments"]
+TEXT_COLUMNS = ["Post_ID", "Title", "Selftext", "Top_Comments", "Full_Text", "Tokens", "URL", "Created_UTC"]
+BOOL_COLUMNS = ["Profanity_Flag"]
+
+
+# NaN stays the missing value (not pd.NA), so fillna(""), str(value) and
+# .str accessors behave exactly as they do on object columns
+def text_dtype():
+    storage = "pyarrow" if importlib.util.find_spec("pyarrow") else "python"
+    try:
+        return pd.StringDtype(storage, na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3
+        return "string[pyarrow_numpy]" if storage == "pyarrow" else object
+
+
+def read_dtypes():
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS}
+    dtypes.update({col: text_dtype() for col in TEXT_COLUMNS})
+    return dtypes
+
+
+# Applies the schema to a frame built in memory (or read without it)
+def compact(df):
+    df = df.copy()
+    text = text_dtype()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    for col in TEXT_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype(text)
+    for col in INTEGER_COLUMNS:
+        # Columns with missing values are float and stay that way
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in BOOL_COLUMNS:
+        if col in df.columns and df[col].dtype != bool and df[col].isin([True, False]).all():
+            df[col] = df[col].astype(bool)
+    return df
+
+
+def load_posts(path, **read_kwargs):
+    df = pd.read_csv(path, dtype=read_dtypes(), **read_kwargs)
+    return compact(df)
+
+
+# === Memory Footprint ===
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def report_memory(label, df):
+    size = frame_memory(df)
+    per_row = size / len(df) if len(df) else 0
+    print(f"[mem] {label}: {len(df)} rows, {size / 2**20:.1f} MiB ({per_row:.0f} B/row)")
+    return size
@@ -0,0 +1,132 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from comment_analytics import ragged_offsets
+
+# === CONFIG ===
+# MMR trades relevance (1.0) against novelty w.r.t. posts already picked (0.0)
+MMR_LAMBDA = 0.7
+# MMR re-ranks only the POOL_FACTOR * k most relevant posts of each group
+MMR_POOL_FACTOR = 5
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+# === Partial Top-k ===
+# Positions of the k highest scores in every group, best first, in one pass:
+# rows are bucketed by group code with a stable counting sort, and each bucket
+# is cut with np.partition (linear in the bucket) before only its k winners
+# are sorted. Equal scores keep input order, so results are deterministic.
+# Rows with a negative code or a NaN score are never selected.
+def top_k_per_group(codes, scores, k, n_groups=None):
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    codes = np.asarray(codes, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    valid = (codes >= 0) & ~np.isnan(scores)
+    rows = np.flatnonzero(valid)
+    codes = codes[valid]
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+    order, offsets = ragged_offsets(codes, n_groups)
+    rows, scores = rows[order], scores[valid][order]
+
+    selected = []
+    for g in range(n_groups):
+        start, stop = offsets[g], offsets[g + 1]
+        bucket = scores[start:stop]
+        if len(bucket) > k:
+            # Everything strictly above the k-th best value, then the earliest
+            # rows tied with it
+            kth = -np.partition(-bucket, k - 1)[k - 1]
+            above = np.flatnonzero(bucket > kth)
+            tied = np.flatnonzero(bucket == kth)[: k - len(above)]
+            keep = np.concatenate([above, tied])
+        else:
+            keep = np.arange(len(bucket))
+        keep = keep[np.lexsort((keep, -bucket[keep]))]
+        selected.append(rows[start + keep])
+    return np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+
+
+# === Rankers ===
+# Higher is better. "length" prefers the longest text, or the text closest to
+# `target_length` when given; "order" keeps input order (head of each group);
+# "random" is a uniform sample without replacement.
+def rank_scores(df, by, text_col="Full_Text", target_length=None, seed=None):
+    if by == "length":
+        length = df[text_col].fillna("").str.len().to_numpy(dtype=np.float64)
+        return -np.abs(length - target_length) if target_length is not None else length
+    if by == "probability":
+        return df["Topic_Probability"].to_numpy(dtype=np.float64)
+    if by == "score":
+        return df["Score"].to_numpy(dtype=np.float64)
+    if by == "order":
+        return np.zeros(len(df))
+    if by == "random":
+        return np.random.default_rng(seed).random(len(df))
+    raise ValueError(f"Unknown ranker: {by}")
+
+
+def _token_counts(texts):
+    return [Counter(TOKEN_PATTERN.findall(str(text).lower())) for text in texts]
+
+
+# Maximal marginal relevance over bag-of-words vectors (cosine similarity):
+# picks k of `texts` one at a time, each time the one maximising
+# lam * relevance - (1 - lam) * max similarity to the posts already picked.
+def mmr(texts, relevance, k, lam=MMR_LAMBDA):
+    counts = _token_counts(texts)
+    vocab = {term: i for i, term in enumerate(sorted(set().union(*counts)))}
+    vectors = np.zeros((len(counts), len(vocab)))
+    for row, doc in enumerate(counts):
+        for term, n in doc.items():
+            vectors[row, vocab[term]] = n
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarity = vectors @ vectors.T
+
+    relevance = np.asarray(relevance, dtype=np.float64)
+    span = relevance.max() - relevance.min() if len(relevance) else 0
+    relevance = (relevance - relevance.min()) / span if span > 0 else np.ones(len(relevance))
+
+    picked = []
+    redundancy = np.zeros(len(relevance))
+    available = np.ones(len(relevance), dtype=bool)
+    for _ in range(min(k, len(relevance))):
+        gain = np.where(available, lam * relevance - (1 - lam) * redundancy, -np.inf)
+        best = int(np.argmax(gain))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return np.array(picked, dtype=np.int64)
+
+
+# === Representative Posts ===
+# The k best rows of `df` per value of `group_col`, grouped in `groups` order
+# (sorted values by default) and best first within each group. `by` is a
+# ranker above or "mmr", which re-ranks the top POOL_FACTOR * k rows of the
+# `relevance` ranker for diversity.
+def select_representatives(
+    df, group_col, k, by="length", groups=None, text_col="Full_Text",
+    target_length=None, relevance="probability", lam=MMR_LAMBDA, seed=None,
+):
+    if groups is None:
+        groups = np.sort(df[group_col].dropna().unique())
+    codes = pd.Categorical(df[group_col], categories=groups).codes
+    ranker = relevance if by == "mmr" else by
+    scores = rank_scores(df, ranker, text_col=text_col, target_length=target_length, seed=seed)
+    pool_k = k * MMR_POOL_FACTOR if by == "mmr" else k
+    positions = top_k_per_group(codes, scores, pool_k, n_groups=len(groups))
+
+    if by == "mmr":
+        pool_codes = codes[positions]
+        picked = []
+        for g in range(len(groups)):
+            pool = positions[pool_codes == g]
+            if len(pool):
+                picked.append(pool[mmr(df[text_col].iloc[pool], scores[pool], k, lam)])
+        positions = np.concatenate(picked) if picked else positions[:0]
+    return df.iloc[positions]
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from gensim.models import LdaModel
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from lda_corpus import load_dictionary
+from lda_inference import infer_topic_mixtures
+from pipeline_startup import ensure_nltk_resources
+from text_normalizer import TextNormalizer
+
+# === CONFIG ===
+MODEL_PATH = "Reddit/results/topic_modeling/lda_model_.gensim"
+HOST = "127.0.0.1"
+PORT = 8765
+WORKERS = 2
+MAX_BATCH = 32
+MAX_WAIT_MS = 5
+LATENCY_WINDOW = 10_000
+
+
+def label_sentiment(score):
+    if score >= 0.05:
+        return "Positive"
+    elif score <= -0.05:
+        return "Negative"
+    else:
+        return "Neutral"
+
+
+# === Scoring Models ===
+# Loaded once in the parent before workers fork. The LDA topic-word arrays
+# (expElogbeta.npy) are memory-mapped read-only, so every worker shares the
+# same page-cache pages instead of holding a private copy.
+class Scorer:
+    def __init__(self, model_path=MODEL_PATH):
+        ensure_nltk_resources("corpora/stopwords", "corpora/wordnet", "sentiment/vader_lexicon.zip")
+        self.lda_model = LdaModel.load(model_path, mmap="r")
+        self.dictionary = load_dictionary()
+        self.normalizer = TextNormalizer()
+        self.sia = SentimentIntensityAnalyzer()
+
+    def score_batch(self, texts):
+        bows = [self.dictionary.doc2bow(self.normalizer(t)) for t in texts]
+        mixtures = infer_topic_mixtures(self.lda_model, bows)
+        results = []
+        for text, mixture in zip(texts, mixtures):
+            sentiment = self.sia.polarity_scores(text)
+            dominant = int(np.argmax(mixture))
+            results.append(
+                {
+                    "dominant_topic": dominant,
+                    "topic_probability": float(mixture[dominant]),
+                    "topics": [float(p) for p in mixture],
+                    "sentiment": {**sentiment, "label": label_sentiment(sentiment["compound"])},
+                }
+            )
+        return results
+
+
+# === Micro-Batching ===
+# Request threads enqueue (text, future) pairs; one batcher thread per worker
+# drains up to MAX_BATCH of them, waiting at most MAX_WAIT_MS after the first,
+# and runs a single batched inference call for the lot.
+class MicroBatcher:
+    def __init__(self, scorer, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, text):
+        future = Future()
+        self.pending.put((text, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self.scorer.score_batch([text for text, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+# === Latency Tracking ===
+class LatencyTracker:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds * 1000)
+            self.count += 1
+
+    def summary(self):
+        with self.lock:
+            samples = np.array(self.samples)
+            count = self.count
+        if not len(samples):
+            return {"pid": os.getpid(), "requests": count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {"pid": os.getpid(), "requests": count, "p50_ms": round(p50, 2), "p99_ms": round(p99, 2)}
+
+
+# === HTTP Handler ===
+# POST /score  {"text": "..."} or {"texts": ["...", ...]}
+# GET  /stats  per-worker request count and p50/p99 latency
+# GET  /health
+class ScoringHandler(BaseHTTPRequestHandler):
+    batcher = None
+    latency = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.latency.summary())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("body must be a JSON object")
+            texts = payload["texts"] if "texts" in payload else [payload["text"]]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError('"texts" must be a list of strings and "text" a string')
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {"error": f"bad request: {e}"})
+            return
+        futures = [self.batcher.submit(t) for t in texts]
+        results = [f.result() for f in futures]
+        self.latency.record(time.perf_counter() - start)
+        self._send_json(200, results if "texts" in payload else results[0])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(listener, scorer):
+    ScoringHandler.batcher = MicroBatcher(scorer)
+    ScoringHandler.latency = LatencyTracker()
+    server = ThreadingHTTPServer(listener.getsockname(), ScoringHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    server.serve_forever()
+
+
+# === Pre-Fork Server ===
+# The listening socket and the models are created once; each forked worker
+# accepts on the shared socket and runs its own batcher thread.
+def main(host=HOST, port=PORT, workers=WORKERS):
+    scorer = Scorer()
+    listener = socket.create_server((host, port), backlog=128)
+    print(f"[✓] Scoring service listening on http://{host}:{port} with {workers} worker(s)")
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        serve(listener, scorer)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            serve(listener, scorer)
+            os._exit(0)
+        children.append(pid)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            os.kill(pid, 15)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    main(args.host, args.port, args.workers)
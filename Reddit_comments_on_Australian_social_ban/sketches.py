@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+
+# === CONFIG ===
+TOPK_CAPACITY = 500
+KLL_K = 400
+SEED = 42
+
+
+# === SpaceSaving Top-K ===
+# Keeps at most `capacity` counters. Each stored count overestimates the true
+# count by at most its error; any item not stored occurred at most `floor`
+# times. Merging follows the mergeable-summaries rule (Agarwal et al.): items
+# missing from one side are charged that side's floor, then the largest
+# `capacity` counters are kept. An exact Counter is a summary with floor 0,
+# so a chunk of tokens is folded in with one merge.
+class SpaceSaving:
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.floor = 0
+
+    def update(self, counts):
+        other = SpaceSaving(self.capacity)
+        other.counts = dict(counts)
+        other.errors = dict.fromkeys(other.counts, 0)
+        self.merge(other)
+
+    def merge(self, other):
+        counts, errors = {}, {}
+        for item in self.counts.keys() | other.counts.keys():
+            counts[item] = self.counts.get(item, self.floor) + other.counts.get(item, other.floor)
+            errors[item] = self.errors.get(item, self.floor) + other.errors.get(item, other.floor)
+        floor = self.floor + other.floor
+        if len(counts) > self.capacity:
+            ranked = sorted(counts, key=lambda item: (-counts[item], item))
+            kept, dropped = ranked[: self.capacity], ranked[self.capacity :]
+            floor = max(floor, counts[dropped[0]])
+            counts = {item: counts[item] for item in kept}
+            errors = {item: errors[item] for item in kept}
+        self.counts, self.errors, self.floor = counts, errors, floor
+        return self
+
+    # Ties are broken by item so results do not depend on merge order
+    def top(self, n=10):
+        ranked = sorted(self.counts, key=lambda item: (-self.counts[item], item))[:n]
+        return [(item, self.counts[item], self.errors[item]) for item in ranked]
+
+
+# === KLL Quantile Sketch ===
+# Karnin-Lang-Liberty compactor hierarchy: level h holds items of weight
+# 2**h, and a full level is sorted and every other item (random offset)
+# promoted. Lower levels get geometrically smaller capacities, so memory is
+# O(k) and rank error is about 1.7/k with high probability, independent of
+# how many values were streamed in. Sketches with the same k merge
+# level by level.
+class KLLSketch:
+    def __init__(self, k=KLL_K, seed=SEED):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # An odd item out stays at this level
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                pairs = level[: len(level) - len(keep)]
+                promoted = pairs[int(self.rng.integers(2)) :: 2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0**h) for h, l in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        if not self.count:
+            return [math.nan] * len(qs)
+        values, cum = self._weighted()
+        ranks = np.asarray(qs, dtype=np.float64) * cum[-1]
+        idx = np.minimum(np.searchsorted(cum, ranks, side="left"), len(values) - 1)
+        return values[idx].tolist()
+
+    # Approximate counts in [edges[i], edges[i+1]) (last bin closed, like
+    # np.histogram), scaled to the true count
+    def histogram(self, edges):
+        if not self.count:
+            return np.zeros(len(edges) - 1)
+        values, cum = self._weighted()
+        positions = np.searchsorted(values, edges, side="left")
+        positions[-1] = np.searchsorted(values, edges[-1], side="right")
+        below = np.concatenate([[0.0], cum])[positions]
+        return np.diff(below) * self.count / cum[-1]
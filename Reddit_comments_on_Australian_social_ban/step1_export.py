@@ -1,4 +1,6 @@
+from pipeline_startup import record_startup
 import praw
+from praw.models import MoreComments
 import pandas as pd
 import time
 import os
@@ -6,6 +8,10 @@ from datetime import datetime
 from datetime import UTC
 from collections import defaultdict
 
+from post_schema import compact, report_memory
+
+record_startup("step1", plots=False)
+
 # ---------- Configuration ----------
 
 CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
@@ -67,21 +73,61 @@ SUBREDDITS = [
     "AskAnAustralian",
 ]
 
+# Comments: the first TOP_COMMENTS top-level comments of each post, plus their
+# replies down to MAX_COMMENT_DEPTH (0 = top level only). REPLACE_MORE_LIMIT
+# is passed to replace_more: 0 drops "load more comments" stubs, None expands
+# all of them (one extra request each). Stubs left over by a positive limit
+# are skipped, at the top level and in replies.
+TOP_COMMENTS = 5
+MAX_COMMENT_DEPTH = 0
+REPLACE_MORE_LIMIT = 0
+
 output_folder = "Reddit/results"
 os.makedirs(output_folder, exist_ok=True)
 
 autosave_path = os.path.join(output_folder, "reddit_autosave_temp.csv")
+comments_autosave_path = os.path.join(output_folder, "reddit_comments_autosave_temp.csv")
 output_filename = os.path.join(output_folder, "reddit_social_media_ban_posts.csv")
+comments_filename = os.path.join(output_folder, "reddit_social_media_ban_comments.csv")
 pairwise_counts_path = os.path.join(output_folder, "pairwise_counts.csv")
 
+
+# ---------- Comment Rows ----------
+def comment_rows(post_id, comments, depth=0):
+    rows = []
+    for comment in comments:
+        if isinstance(comment, MoreComments):
+            continue
+        rows.append(
+            {
+                "Post_ID": post_id,
+                "Comment_ID": comment.id,
+                "Parent_ID": comment.parent_id.split("_", 1)[-1],
+                "Score": comment.score,
+                "Depth": depth,
+                "Created_Epoch": int(comment.created_utc),
+                "Body": comment.body,
+            }
+        )
+        if depth < MAX_COMMENT_DEPTH:
+            rows.extend(comment_rows(post_id, comment.replies, depth + 1))
+    return rows
+
+
 # ---------- Resume or Start Fresh ----------
 if os.path.exists(autosave_path):
     print("Resuming from autosave...")
     df_existing = pd.read_csv(autosave_path)
     posts = df_existing.to_dict(orient="records")
+    comments = (
+        pd.read_csv(comments_autosave_path).to_dict(orient="records")
+        if os.path.exists(comments_autosave_path)
+        else []
+    )
 else:
     print("Starting fresh scrape...")
     posts = []
+    comments = []
 
 # ---------- Tracking ----------
 pairwise_counts = defaultdict(int)
@@ -95,9 +141,13 @@ for subreddit_name in SUBREDDITS:
             for post in subreddit.search(term, limit=100):
                 try:
                     submission = reddit.submission(id=post.id)
-                    submission.comments.replace_more(limit=0)
-                    top_comments = [comment.body for comment in submission.comments[:5]]
-                    combined_comments = "\n---\n".join(top_comments)
+                    submission.comments.replace_more(limit=REPLACE_MORE_LIMIT)
+                    top_level = [c for c in submission.comments if not isinstance(c, MoreComments)]
+                    top_level = top_level[:TOP_COMMENTS]
+                    comments.extend(comment_rows(post.id, top_level))
+                    # Kept for older consumers; comment-level analysis reads
+                    # the comments table
+                    combined_comments = "\n---\n".join(comment.body for comment in top_level)
                 except Exception as e:
                     print(f"Error fetching comments for post {post.id}: {e}")
                     combined_comments = ""
@@ -108,6 +158,7 @@ for subreddit_name in SUBREDDITS:
 
                 posts.append(
                     {
+                        "Post_ID": post.id,
                         "Subreddit": subreddit_name,
                         "Search_Term": term,
                         "Title": post.title,
@@ -117,6 +168,7 @@ for subreddit_name in SUBREDDITS:
                         "Author": str(post.author),
                         "URL": post.url,
                         "Created_UTC": formatted_time,
+                        "Created_Epoch": int(post.created_utc),
                         "Top_Comments": combined_comments,
                     }
                 )
@@ -125,6 +177,7 @@ for subreddit_name in SUBREDDITS:
                 time.sleep(0.5)
 
             pd.DataFrame(posts).to_csv(autosave_path, index=False)
+            pd.DataFrame(comments).to_csv(comments_autosave_path, index=False)
             print(f"Autosaved after: {term} in r/{subreddit_name}")
 
         except Exception as e:
@@ -133,11 +186,18 @@ for subreddit_name in SUBREDDITS:
         time.sleep(1)
 
 # ---------- Save Final Results ----------
-df = pd.DataFrame(posts)
+df = compact(pd.DataFrame(posts))
 print(f"\nTotal posts collected: {len(df)}")
+report_memory("step1 posts", df)
 df.to_csv(output_filename, index=False)
 print(f"Final save successful: {output_filename}")
 
+# ---------- Save Comments ----------
+# One row per comment; a post found under several search terms is stored once
+comments_df = pd.DataFrame(comments).drop_duplicates(subset="Comment_ID")
+comments_df.to_csv(comments_filename, index=False)
+print(f"Comments saved: {comments_filename} ({len(comments_df)} comments)")
+
 # ---------- Save Pairwise Counts ----------
 counts_df = pd.DataFrame(
     [
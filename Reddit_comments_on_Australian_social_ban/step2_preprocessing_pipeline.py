@@ -1,10 +1,22 @@
+from pipeline_startup import record_startup, step_arg_parser
 import pandas as pd
 import re
 import json
 from datetime import datetime
-from langdetect import detect, LangDetectException
+from langdetect import DetectorFactory, detect, LangDetectException
 import os
 
+import lazy_backend
+from post_index import fts5_available, phrase_query, search, update_index
+from post_schema import load_posts, report_memory
+
+args = lazy_backend.add_engine_argument(step_arg_parser("Preprocessing pipeline", plots=False)).parse_args()
+record_startup("step2", plots=False)
+ENGINE = lazy_backend.resolve_engine(args.engine)
+
+# langdetect samples at random; a fixed seed makes reruns (and engines) agree
+DetectorFactory.seed = 0
+
 # === CONFIG ===
 RAW_PATH = "Reddit/results/reddit_social_media_ban_posts.csv"
 OUTPUT_DIR = "Reddit/results/preprocessing"
@@ -18,59 +30,6 @@ score_threshold = 3
 date_cutoff = pd.to_datetime("2023-10-01")
 min_length = 20
 
-# === STAGE 1: Initial Cleanup ===
-df_raw = pd.read_csv(RAW_PATH)
-print(f"[1] Raw rows: {len(df_raw)}")
-
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-df = df_raw.sort_values(by="Score", ascending=False).drop_duplicates(subset="URL", keep="first")
-print(f"[1] After deduplication: {len(df)}")
-
-df = df[
-    df.apply(
-        lambda row: len(str(row.get("Title", "")) + str(row.get("Selftext", ""))) > min_length,
-        axis=1,
-    )
-]
-print(f"[1] After length filter: {len(df)}")
-df.to_csv(STAGE1_OUTPUT, index=False)
-
-# === STAGE 2: Filtering ===
-filter_stats = {
-    "initial": len(df),
-    "placeholder_removed": 0,
-    "date_filtered": 0,
-    "score_filtered": 0,
-    "length_filtered": 0,
-    "lang_filtered": 0,
-    "author_filtered": 0,
-    "empty_body_filtered": 0,
-    "profanity_flagged": 0,
-}
-
-# Remove placeholders
-before = len(df)
-df = df[~df["Title"].str.strip().str.lower().isin(["[deleted]", "[removed]", ""])]
-filter_stats["placeholder_removed"] = before - len(df)
-
-# Date filter
-df["Created_Date"] = pd.to_datetime(df["Created_UTC"], errors="coerce")
-before = len(df)
-df = df[df["Created_Date"] >= date_cutoff]
-filter_stats["date_filtered"] = before - len(df)
-
-# Score filter
-before = len(df)
-df = df[df["Score"] >= score_threshold]
-filter_stats["score_filtered"] = before - len(df)
-
-# Length filter again
-df["combined_text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
-before = len(df)
-df = df[df["combined_text"].str.len() >= min_length]
-filter_stats["length_filtered"] = before - len(df)
-
 # Language filter
 def is_english(text):
     try:
@@ -78,32 +37,107 @@ def is_english(text):
     except LangDetectException:
         return False
 
-before = len(df)
-df = df[df["combined_text"].apply(is_english)]
-filter_stats["lang_filtered"] = before - len(df)
+profanity_words = ["fuck", "shit", "bitch", "asshole", "dick", "bastard"]
 
-# Drop anonymous authors
-before = len(df)
-df = df[df["Author"].notna() & (df["Author"].str.lower() != "none")]
-filter_stats["author_filtered"] = before - len(df)
+os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Drop empty bodies
-before = len(df)
-df = df[df["Selftext"].fillna("").str.strip() != ""]
-filter_stats["empty_body_filtered"] = before - len(df)
+# === STAGE 1 + 2 on polars ===
+# Same filters as the pandas stages below, run as lazy queries; the outputs
+# match the pandas engine row for row. The filter chain exists once per
+# engine, so any change to it must keep benchmarks/engine_benchmark.py --check
+# passing.
+if ENGINE == "polars":
+    stage1 = lazy_backend.stage1_polars(RAW_PATH, min_length)
+    print(f"[1] After deduplication and length filter: {len(stage1)}")
+    lazy_backend.to_posts(stage1).to_csv(STAGE1_OUTPUT, index=False)
+    stage2, filter_stats = lazy_backend.stage2_polars(
+        stage1, date_cutoff, score_threshold, min_length, is_english, profanity_words
+    )
+    df = lazy_backend.to_posts(stage2)
+
+# === STAGE 1: Initial Cleanup ===
+if ENGINE == "pandas":
+    df_raw = load_posts(RAW_PATH)
+    print(f"[1] Raw rows: {len(df_raw)}")
+    report_memory("step2 raw", df_raw)
+
+    # Stable, so posts with equal scores keep their scrape order
+    df = df_raw.sort_values(by="Score", ascending=False, kind="stable").drop_duplicates(
+        subset="URL", keep="first"
+    )
+    print(f"[1] After deduplication: {len(df)}")
+
+    df = df[
+        df.apply(
+            lambda row: len(str(row.get("Title", "")) + str(row.get("Selftext", ""))) > min_length,
+            axis=1,
+        )
+    ]
+    print(f"[1] After length filter: {len(df)}")
+    df.to_csv(STAGE1_OUTPUT, index=False)
+
+# === STAGE 2: Filtering ===
+if ENGINE == "pandas":
+    filter_stats = dict.fromkeys(lazy_backend.STAGE2_STATS, 0)
+    filter_stats["initial"] = len(df)
+
+    # Remove placeholders
+    before = len(df)
+    df = df[~df["Title"].str.strip().str.lower().isin(lazy_backend.PLACEHOLDER_TITLES)]
+    filter_stats["placeholder_removed"] = before - len(df)
+
+    # Date filter (step1 stores Created_Epoch as int64 seconds; older exports
+    # only have the formatted Created_UTC string, and rows appended from them
+    # have a missing epoch, so those fall back to Created_UTC row by row)
+    created_utc = pd.to_datetime(df["Created_UTC"], errors="coerce")
+    if "Created_Epoch" in df.columns:
+        epoch = pd.to_datetime(df["Created_Epoch"], unit="s", errors="coerce")
+        df["Created_Date"] = epoch.fillna(created_utc.astype(epoch.dtype))
+    else:
+        df["Created_Date"] = created_utc
+    before = len(df)
+    df = df[df["Created_Date"] >= date_cutoff]
+    filter_stats["date_filtered"] = before - len(df)
+    df["Created_Epoch"] = (df["Created_Date"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+    # Score filter
+    before = len(df)
+    df = df[df["Score"] >= score_threshold]
+    filter_stats["score_filtered"] = before - len(df)
+
+    # Length filter again
+    df["combined_text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
+    before = len(df)
+    df = df[df["combined_text"].str.len() >= min_length]
+    filter_stats["length_filtered"] = before - len(df)
+
+    before = len(df)
+    df = df[df["combined_text"].apply(is_english)]
+    filter_stats["lang_filtered"] = before - len(df)
+
+    # Drop anonymous authors
+    before = len(df)
+    df = df[df["Author"].notna() & (df["Author"].str.lower() != "none")]
+    filter_stats["author_filtered"] = before - len(df)
+
+    # Drop empty bodies
+    before = len(df)
+    df = df[df["Selftext"].fillna("").str.strip() != ""]
+    filter_stats["empty_body_filtered"] = before - len(df)
+
+    # Profanity flagging
+    df["Profanity_Flag"] = (
+        df["combined_text"]
+        .str.lower()
+        .apply(lambda text: any(word in text for word in profanity_words))
+    )
+    filter_stats["profanity_flagged"] = df["Profanity_Flag"].sum()
+
+    df.drop(columns=["combined_text"], inplace=True)
 
-# Profanity flagging
-profanity_words = ["fuck", "shit", "bitch", "asshole", "dick", "bastard"]
-df["Profanity_Flag"] = (
-    df["combined_text"]
-    .str.lower()
-    .apply(lambda text: any(word in text for word in profanity_words))
-)
-filter_stats["profanity_flagged"] = df["Profanity_Flag"].sum()
-
-df.drop(columns=["combined_text"], inplace=True)
 df.to_csv(STAGE2_OUTPUT, index=False)
 print(f"[2] Stage 2 saved to: {STAGE2_OUTPUT} ({len(df)} rows)")
+report_memory("step2 stage 2", df)
 
 with open(STATS_OUTPUT, "w") as f:
     json.dump({k: int(v) for k, v in filter_stats.items()}, f, indent=2)
@@ -115,12 +149,25 @@ ban_keywords = [
     "let kids be kids", "Online Safety Commissioner", "digital ID", "age restriction",
     "kids off social media"
 ]
-pattern = "|".join(ban_keywords)
 
-keyword_filtered = df[
-    df["Title"].str.contains(pattern, case=False, na=False)
-    | df.get("Search_Term", "").astype(str).str.contains(pattern, case=False, na=False)
-]
+if fts5_available():
+    # Stage 2 rows (posts + comments) go into the local full-text index; the
+    # keyword filter is an index query over Title and Search_Term, and each
+    # kept post carries its BM25 relevance. df is the whole current stage 2
+    # table, so posts filtered out since earlier runs are pruned and BM25
+    # statistics never depend on run history.
+    update_index(df, prune=True)
+    hits = search(phrase_query(ban_keywords), columns=["title", "search_term"])
+    keyword_filtered = df[df["URL"].isin(hits["URL"])].copy()
+    keyword_filtered["Keyword_BM25"] = keyword_filtered["URL"].map(hits.set_index("URL")["BM25"])
+else:
+    print("[3] SQLite FTS5 trigram tokenizer unavailable; falling back to a regex scan")
+    pattern = "|".join(ban_keywords)
+    keyword_filtered = df[
+        df["Title"].str.contains(pattern, case=False, na=False)
+        | df.get("Search_Term", "").astype(str).str.contains(pattern, case=False, na=False)
+    ].copy()
+    keyword_filtered["Keyword_BM25"] = float("nan")
 
 keyword_filtered.to_csv(STAGE3_OUTPUT, index=False)
 print(f"[3] Stage 3 complete. Final keyword-filtered file saved: {STAGE3_OUTPUT} ({len(keyword_filtered)} posts)")
@@ -1,10 +1,19 @@
+from pipeline_startup import record_startup, step_arg_parser
 import os
 import pandas as pd
 import json
-import matplotlib.pyplot as plt
-import graphviz
 import numpy as np
 
+import charts
+from chart_render import Chart, render_charts
+from post_schema import load_posts, report_memory
+
+args = step_arg_parser("Filtering pipeline report").parse_args()
+PLOTS = not args.no_plots
+if PLOTS:
+    import graphviz
+record_startup("step3", plots=PLOTS)
+
 # === Ensure output folder exists ===
 os.makedirs("Reddit/results/filtering/", exist_ok=True)
 
@@ -23,9 +32,11 @@ BAR_CHART_FILE = "Reddit/results/filtering/filtering_pipeline_bar_chart.png"
 LINE_CHART_FILE = "Reddit/results/filtering/filtering_pipeline_line_chart.png"
 
 # === Load data ===
-raw_df = pd.read_csv(RAW_PATH)
-stage1_df = pd.read_csv(STAGE1_PATH)
-stage3_df = pd.read_csv(STAGE3_PATH)
+raw_df = load_posts(RAW_PATH)
+stage1_df = load_posts(STAGE1_PATH)
+stage3_df = load_posts(STAGE3_PATH)
+for label, frame in [("raw", raw_df), ("stage 1", stage1_df), ("stage 3", stage3_df)]:
+    report_memory(f"step3 {label}", frame)
 
 with open(STATS_PATH) as f:
     stats = json.load(f)
@@ -74,6 +85,10 @@ df.to_html(OUTPUT_HTML, index=False)
 
 print(f"\n✅ Saved table to:\n{OUTPUT_CSV}\n{OUTPUT_MD}\n{OUTPUT_HTML}")
 
+if not PLOTS:
+    print("\n✅ --no-plots: skipped flowchart and charts.")
+    raise SystemExit(0)
+
 # === Flowchart ===
 g = graphviz.Digraph(format="png")
 g.attr(rankdir="LR", size="8,5")
@@ -87,50 +102,14 @@ for i in range(len(steps) - 1):
 g.render(filename=OUTPUT_FLOWCHART, cleanup=True)
 print(f"\n✅ Flowchart saved to: {OUTPUT_FLOWCHART}")
 
-# === Horizontal Bar Chart ===
-stages = df["Stage"]
-vals = df["Posts Remaining"].fillna(0).astype(int).tolist()
-
-plt.figure(figsize=(12, 7))
-bar_height = 0.4
-y_positions = list(range(len(stages)))
-
-plt.barh(
-    y_positions,
-    vals,
-    height=bar_height,
-    color="orange",  # Fixed color for general use
-)
-
-for i, val in enumerate(vals):
-    if val > 0:
-        plt.text(val + 100, i, str(val), va="center", fontsize=8)
-
-plt.yticks(y_positions, stages)
-plt.gca().invert_yaxis()
-plt.xlabel("Number of Posts")
-plt.title("Reddit Filtering Pipeline")
-plt.tight_layout()
-plt.savefig(BAR_CHART_FILE, dpi=300)
-plt.show()
-
-# === Line Chart ===
-plt.figure(figsize=(14, 6))
-plt.plot(
-    stages,
-    vals,
-    marker="o",
-    color="orange",
-    label="Filtered Dataset",
+# === Bar & Line Charts ===
+chart_data = {"stages": steps, "counts": df["Posts Remaining"].fillna(0).astype(int).tolist()}
+render_charts(
+    [
+        Chart(BAR_CHART_FILE, charts.filtering_bar, chart_data, dpi=300),
+        Chart(LINE_CHART_FILE, charts.filtering_line, chart_data, dpi=300),
+    ]
 )
-plt.xticks(rotation=45, ha="right")
-plt.ylabel("Posts Remaining")
-plt.title("Reddit Filtering Pipeline")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(LINE_CHART_FILE, dpi=300)
-plt.show()
 print(f"\n✅ Bar chart saved to: {BAR_CHART_FILE}")
 print(f"✅ Line chart saved to: {LINE_CHART_FILE}")
-print("\n✅ All filtering pipeline visualizations completed.")
\ No newline at end of file
+print("\n✅ All filtering pipeline visualizations completed.")
@@ -1,10 +1,17 @@
+from pipeline_startup import record_startup, step_arg_parser
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import Counter
-import seaborn as sns
 import os
 import re
 
+import charts
+from chart_render import Chart, render_charts
+from corpus_cache import analyzer_identity, cached_corpus
+from post_schema import load_posts, report_memory
+
+args = step_arg_parser("Exploratory data analysis").parse_args()
+PLOTS = not args.no_plots
+record_startup("step4", plots=PLOTS)
+
 # === CONFIG ===
 INPUT_FILE = "Reddit/results/preprocessing/reddit_keywords_stage3.csv"
 OUTPUT_DIR = "Reddit/results/eda_outputs"
@@ -20,74 +27,64 @@ def clean_text(text):
     return text
 
 
-def top_words(df, col="Title", top_n=20):
-    words = []
-    for text in df[col].dropna():
-        words += clean_text(text).split()
-    return Counter(words).most_common(top_n)
+def tokenize_titles(texts):
+    return [clean_text(text).split() if pd.notna(text) else [] for text in texts]
+
+
+def write_keywords(path, keywords):
+    with open(path, "w", encoding="utf-8") as f:
+        for group, words in keywords.items():
+            f.write(f"{group}:\n")
+            for word, count in words:
+                f.write(f"  {word}: {count}\n")
+            f.write("\n")
 
 
 # === Load Data ===
-df = pd.read_csv(INPUT_FILE)
-
-# === Top Subreddits ===
-sub_counts = df["Subreddit"].value_counts()
-plt.figure(figsize=(10, 6))
-sub_counts.head(10).plot(kind="bar", color="orange")
-plt.title("Top 10 Subreddits")
-plt.ylabel("Post Count")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/top_subreddits.png")
-plt.close()
-
-# === Word Frequency (Title) ===
-word_df = pd.DataFrame(top_words(df, "Title"), columns=["Word", "Count"])
-plt.figure(figsize=(10, 6))
-sns.barplot(data=word_df, x="Count", y="Word", color="orange")
-plt.title("Top Words in Titles")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/top_words.png")
-plt.close()
-
-# Combined Score and Comment Distribution - Subplots
-
-fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
-
-# Score
-sns.histplot(df["Score"].dropna(), bins=30, color="orange", kde=True, ax=axes[0])
-axes[0].set_title("Score Distribution")
-axes[0].set_xlabel("Score")
-
-# Comments
-sns.histplot(df["Num_Comments"].dropna(), bins=30, color="blue", kde=True, ax=axes[1])
-axes[1].set_title("Comment Count Distribution")
-axes[1].set_xlabel("Number of Comments")
-
-fig.suptitle("Distributions of Post Score(Upvotes) and Comment Count", fontsize=16)
-plt.tight_layout(rect=[0, 0, 1, 0.95])
-plt.savefig(f"{OUTPUT_DIR}/score_comments_combined.png")
-plt.close()
-
-
-# === Top Keywords per Subreddit ===
-def top_keywords_by_subreddit(df, top_n=5):
-    result = {}
-    grouped = df.groupby("Subreddit")
-    for subreddit, group in grouped:
-        word_counts = Counter()
-        for title in group["Title"].dropna():
-            words = clean_text(title).split()
-            word_counts.update(words)
-        result[subreddit] = word_counts.most_common(top_n)
-    return result
-
-
-subreddit_keywords = top_keywords_by_subreddit(df)
-with open(f"{OUTPUT_DIR}/top_keywords.txt", "w", encoding="utf-8") as f:
-    for sub, words in subreddit_keywords.items():
-        f.write(f"{sub}:\n")
-        for word, count in words:
-            f.write(f"  {word}: {count}\n")
-        f.write("\n")
+df = load_posts(INPUT_FILE)
+report_memory("step4", df)
+
+# Titles are tokenized once into a cached sparse doc x term matrix; every
+# top-k below is a group sum over it
+meta_cols = [c for c in ["URL", "Subreddit", "Search_Term"] if c in df.columns]
+titles = cached_corpus(
+    "titles", df["Title"], tokenize_titles, df[meta_cols],
+    analyzer_name=analyzer_identity(clean_text, tokenize_titles),
+)
+
+if PLOTS:
+    # Top subreddits, top title words, and score / comment count histograms
+    render_charts(
+        [
+            Chart(
+                f"{OUTPUT_DIR}/top_subreddits.png",
+                charts.count_bars,
+                df["Subreddit"].value_counts().head(10),
+                {"title": "Top 10 Subreddits", "ylabel": "Post Count"},
+            ),
+            Chart(
+                f"{OUTPUT_DIR}/top_words.png",
+                charts.top_words,
+                pd.DataFrame(titles.top_terms(20), columns=["Word", "Count"]),
+                {"title": "Top Words in Titles"},
+            ),
+            Chart(
+                f"{OUTPUT_DIR}/score_comments_combined.png",
+                charts.score_comments,
+                {
+                    "score": charts.histogram_summary(df["Score"].dropna()),
+                    "comments": charts.histogram_summary(df["Num_Comments"].dropna()),
+                },
+            ),
+        ]
+    )
+
+
+# === Top Keywords per Subreddit / Search Term ===
+write_keywords(f"{OUTPUT_DIR}/top_keywords.txt", titles.top_terms(5, "Subreddit"))
+if "Search_Term" in df.columns:
+    write_keywords(
+        f"{OUTPUT_DIR}/top_keywords_by_search_term.txt", titles.top_terms(5, "Search_Term")
+    )
 
 print(f"\n✅ EDA complete. Outputs saved to: {OUTPUT_DIR}")
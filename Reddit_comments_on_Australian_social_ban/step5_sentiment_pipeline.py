@@ -1,12 +1,21 @@
+from pipeline_startup import ensure_nltk_resources, record_startup, step_arg_parser
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
 import warnings
 
+import charts
+from bootstrap_ci import bootstrap_ci
+from chart_render import Chart, render_charts
+from comment_analytics import comment_segments, per_post_stats
+from post_schema import load_posts, report_memory
+from representative_select import select_representatives
+
+args = step_arg_parser("Sentiment pipeline").parse_args()
+PLOTS = not args.no_plots
+record_startup("step5", plots=PLOTS)
+
 warnings.filterwarnings("ignore")  # hides matplotlib seaborn deprecation msgs
 
 # === CONFIG ===
@@ -14,11 +23,11 @@ INPUT_FILE = "Reddit/results/preprocessing/reddit_keywords_stage3.csv"
 OUTPUT_DIR = "Reddit/results/sentiment_outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# nltk.download("vader_lexicon")
+ensure_nltk_resources("sentiment/vader_lexicon.zip")
 sia = SentimentIntensityAnalyzer()
 
 # === Load Data ===
-df = pd.read_csv(INPUT_FILE)
+df = load_posts(INPUT_FILE)
 df["Full_Text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
 
 # === Sentiment on Post Content ===
@@ -36,6 +45,19 @@ def get_comment_sentiment(row):
 comment_sentiments = df.apply(get_comment_sentiment, axis=1, result_type="expand")
 df = pd.concat([df, comment_sentiments.add_prefix("Comment_")], axis=1)
 
+# === Per-Comment Sentiment ===
+# Every comment is scored on its own (from the comments table, or split out of
+# Top_Comments for older scrapes); per-post mean/min/max/std of comment
+# sentiment and length come from one ragged-array pass, not a loop per post
+comments, comment_codes, row_segments = comment_segments(df)
+comments["compound"] = [sia.polarity_scores(body)["compound"] for body in comments["Body"]]
+comments["tokens"] = comments["Body"].str.count(r"\S+")
+comment_cols = [c for c in ["Post_ID", "Comment_ID", "Parent_ID", "Score", "Depth", "compound", "tokens"]
+                if c in comments.columns]
+comments[comment_cols].to_csv(f"{OUTPUT_DIR}/comment_level_sentiment.csv", index=False)
+df = pd.concat([df, per_post_stats(comments, comment_codes, row_segments, ["compound", "tokens"])], axis=1)
+print(f"[✓] Scored {len(comments)} comments across {len(df)} posts")
+
 # === Full Context Sentiment (Post + Comment) ===
 def get_full_context_sentiment(row):
     full_text = (
@@ -69,130 +91,125 @@ df["Full_vs_Post"] = df["Full_compound"] - df["Post_compound"]
 
 # === Save Extended Dataset ===
 df.to_csv(f"{OUTPUT_DIR}/reddit_with_sentiment.csv", index=False)
-
-# === Plot Distribution Helper ===
-def plot_dist(column, title, filename, color="royalblue"):
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df[column], bins=30, kde=True, color=color)
-    plt.axvline(0, color="gray", linestyle="--")
-    plt.title(title)
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/{filename}")
-    plt.close()
-
-# === Plot Histograms & KDEs ===
-plot_dist("Post_compound", "Post Sentiment Distribution", "post_sentiment_dist.png")
-plot_dist("Comment_compound", "Comment Sentiment Distribution", "comment_sentiment_dist.png")
-plot_dist("Full_compound", "Full Context Sentiment", "full_sentiment_dist.png")
-plot_dist("Comment_vs_Post", "Comment vs Post Sentiment Delta", "comment_vs_post_delta.png")
-plot_dist("Full_vs_Post", "Full vs Post Sentiment Delta", "full_vs_post_delta.png")
+report_memory("step5 with sentiment", df)
+
+# === Append-Only Stream Log ===
+# streaming_eda sketches this log incrementally: posts not logged before are
+# appended (fixed columns), nothing already logged is rewritten
+STREAM_LOG = f"{OUTPUT_DIR}/sentiment_stream_log.csv"
+STREAM_COLUMNS = ["URL", "Subreddit", "Title", "Score", "Num_Comments",
+                  "Post_compound", "Comment_compound", "Full_compound"]
+logged = pd.read_csv(STREAM_LOG, usecols=["URL"])["URL"] if os.path.exists(STREAM_LOG) else pd.Series(dtype=object)
+new_posts = df.loc[~df["URL"].isin(logged), STREAM_COLUMNS].drop_duplicates(subset="URL")
+new_posts.to_csv(STREAM_LOG, mode="a", header=not os.path.exists(STREAM_LOG), index=False)
+print(f"[✓] Appended {len(new_posts)} new posts to {STREAM_LOG}")
 
 # === Subreddit Sentiment Averages ===
-subreddit_avg = (
-    df.groupby("Subreddit")[["Post_compound", "Comment_compound", "Full_compound"]]
-    .mean()
-    .reset_index()
+subreddit_avg = bootstrap_ci(
+    df, "Subreddit", ["Post_compound", "Comment_compound", "Full_compound"]
 )
 subreddit_avg.to_csv(f"{OUTPUT_DIR}/subreddit_sentiment_averages.csv", index=False)
 
-# === Bar Charts: Top Positive & Negative Subreddits ===
-def bar_chart_subreddits(data, col, title, fname, top=True):
-    top_data = data.sort_values(col, ascending=not top).head(10)
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x=col, y="Subreddit", data=top_data, palette="Blues" if top else "Reds")
-    plt.title(title)
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/{fname}", dpi=300)
-    plt.close()
-
-bar_chart_subreddits(subreddit_avg, "Post_compound", "Top Positive Subreddits", "top_positive_subreddits.png", top=True)
-bar_chart_subreddits(subreddit_avg, "Post_compound", "Top Negative Subreddits", "top_negative_subreddits.png", top=False)
-
-# === Scatter Plot: Post vs Comment Sentiment ===
-plt.figure(figsize=(8, 6))
-sns.scatterplot(x=df["Post_compound"], y=df["Comment_compound"], alpha=0.5)
-plt.axhline(0, color="gray", linestyle="--")
-plt.axvline(0, color="gray", linestyle="--")
-plt.xlabel("Post Sentiment")
-plt.ylabel("Comment Sentiment")
-plt.title("Post vs Comment Sentiment")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/scatter_post_vs_comment.png")
-plt.close()
-
 # === Sentiment by Search Term ===
 if "Search_Term" in df.columns:
-    term_avg = (
-        df.groupby("Search_Term")[["Post_compound", "Comment_compound"]]
-        .mean()
-        .reset_index()
-    )
+    term_avg = bootstrap_ci(df, "Search_Term", ["Post_compound", "Comment_compound"])
     term_avg.to_csv(f"{OUTPUT_DIR}/sentiment_by_search_term.csv", index=False)
 
-    plt.figure(figsize=(12, 6))
-    x = term_avg["Search_Term"]
-    x_pos = range(len(x))
-    plt.plot(x_pos, term_avg["Post_compound"], label="Post", marker="o", color="royalblue")
-    plt.plot(x_pos, term_avg["Comment_compound"], label="Comment", marker="o", color="orange")
-    plt.xticks(x_pos, x, rotation=45, ha="right")
-    plt.title("Sentiment by Search Term")
-    plt.ylabel("Average Compound Sentiment")
-    plt.grid(True, linestyle="--", alpha=0.5)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/sentiment_by_search_term.png")
-    plt.close()
-
-# === Comment Sentiment Pie Chart ===
-comment_counts = df["Comment_Label"].value_counts()
-colors = {"Positive": "green", "Negative": "red", "Neutral": "gray"}
-plt.figure(figsize=(5, 5))
-comment_counts.plot.pie(
-    autopct="%1.1f%%",
-    colors=[colors.get(label, "blue") for label in comment_counts.index],
+# === Subreddit-Level Post vs Comment Sentiment Comparison ===
+post_comment_comp = (
+    df.groupby("Subreddit", observed=True)[["Post_compound", "Comment_compound"]].mean().reset_index()
 )
-plt.title("Comment Sentiment Distribution")
-plt.ylabel("")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/comment_sentiment_pie.png")
-plt.close()
-
-# === Avg Comment Sentiment per Subreddit (Horizontal Bar) ===
-comment_avg = df.groupby("Subreddit")["Comment_compound"].mean().sort_values()
-plt.figure(figsize=(12, 8))
-comment_avg.plot(kind="barh", color="teal")
-plt.title("Average Comment Sentiment per Subreddit")
-plt.xlabel("Sentiment Score")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/comment_sentiment_by_subreddit.png", dpi=300)
-plt.close()
-
-# === Avg Full Context Sentiment per Subreddit (Vertical Bar) ===
-full_context_avg = df.groupby("Subreddit")["Full_compound"].mean().reset_index()
-sorted_context = full_context_avg.sort_values("Full_compound")
-plt.figure(figsize=(12, 8))
-sns.barplot(x="Full_compound", y="Subreddit", data=sorted_context, palette="Purples_r")
-plt.title("Average Full Context Sentiment per Subreddit")
-plt.xlabel("Full Context Sentiment Score")
-plt.tight_layout()
-plt.savefig(f"{OUTPUT_DIR}/full_context_sentiment_by_subreddit.png", dpi=300)
-plt.close()
+post_comment_comp.to_csv(os.path.join(OUTPUT_DIR, "subreddit_post_vs_comment_sentiment.csv"), index=False)
 
-# === Sample Comments to CSV/Text ===
-sample_rows = []
-for label in ["Positive", "Negative", "Neutral"]:
-    subset = df[df["Comment_Label"] == label]
-    samples = subset[["Subreddit", "Top_Comments"]].dropna().head(5).copy()
-    samples["Sentiment_Label"] = label
-    sample_rows.append(samples)
-if sample_rows:
-    sample_df = pd.concat(sample_rows, ignore_index=True)
-    sample_df.to_csv(os.path.join(OUTPUT_DIR, "sample_comments_all_sentiments.csv"), index=False)
+# === Charts ===
+# Every chart is declared on a small aggregate and rendered in parallel;
+# charts whose inputs did not change since the last run are skipped
+def chart(fname, draw, data, dpi=100, **style):
+    return Chart(os.path.join(OUTPUT_DIR, fname), draw, data, style, dpi=dpi)
+
+
+def top_subreddits(col, top=True):
+    return subreddit_avg.sort_values(col, ascending=not top).head(10)[["Subreddit", col]]
+
+
+if PLOTS:
+    hist = charts.histogram_summary
+    by_subreddit = df.groupby("Subreddit", observed=True)
+    specs = [
+        chart(fname, charts.histogram, hist(df[col]), title=title, xlabel=col)
+        for col, title, fname in [
+            ("Post_compound", "Post Sentiment Distribution", "post_sentiment_dist.png"),
+            ("Comment_compound", "Comment Sentiment Distribution", "comment_sentiment_dist.png"),
+            ("Full_compound", "Full Context Sentiment", "full_sentiment_dist.png"),
+            ("Comment_vs_Post", "Comment vs Post Sentiment Delta", "comment_vs_post_delta.png"),
+            ("Full_vs_Post", "Full vs Post Sentiment Delta", "full_vs_post_delta.png"),
+        ]
+    ]
+    specs += [
+        chart(
+            "top_positive_subreddits.png", charts.subreddit_bars, top_subreddits("Post_compound"), dpi=300,
+            col="Post_compound", title="Top Positive Subreddits", palette="Blues",
+        ),
+        chart(
+            "top_negative_subreddits.png", charts.subreddit_bars, top_subreddits("Post_compound", top=False),
+            dpi=300, col="Post_compound", title="Top Negative Subreddits", palette="Reds",
+        ),
+        chart(
+            "scatter_post_vs_comment.png", charts.sentiment_scatter,
+            {"x": df["Post_compound"].to_numpy(), "y": df["Comment_compound"].to_numpy()},
+        ),
+        chart(
+            "comment_sentiment_pie.png", charts.label_pie, df["Comment_Label"].value_counts(),
+            title="Comment Sentiment Distribution",
+            colors={"Positive": "green", "Negative": "red", "Neutral": "gray"},
+        ),
+        chart(
+            "comment_sentiment_by_subreddit.png", charts.series_barh,
+            by_subreddit["Comment_compound"].mean().sort_values(), dpi=300,
+            title="Average Comment Sentiment per Subreddit", xlabel="Sentiment Score",
+        ),
+        chart(
+            "full_context_sentiment_by_subreddit.png", charts.subreddit_bars,
+            by_subreddit["Full_compound"].mean().reset_index().sort_values("Full_compound"), dpi=300,
+            col="Full_compound", title="Average Full Context Sentiment per Subreddit", palette="Purples_r",
+            xlabel="Full Context Sentiment Score", figsize=(12, 8),
+        ),
+        chart("subreddit_post_vs_comment_scatter.png", charts.subreddit_scatter, post_comment_comp, dpi=300),
+        chart(
+            "tone_difference_hist.png", charts.histogram, hist(df["Comment_vs_Post"]), dpi=300,
+            title="Audience vs Author Tone Difference", color="darkred", xlabel="Comment - Post Sentiment",
+        ),
+        chart(
+            "hist_full_vs_post_difference.png", charts.histogram, hist(df["Full_vs_Post"]), dpi=300,
+            title="Difference Between Full Context and Post Sentiment", color="darkblue",
+            xlabel="Full Context - Post Sentiment",
+        ),
+    ]
+    if "Search_Term" in df.columns:
+        specs.append(
+            chart(
+                "sentiment_by_search_term.png", charts.search_term_lines,
+                term_avg[["Search_Term", "Post_compound", "Comment_compound"]],
+            )
+        )
+    render_charts(specs)
 
+# === Sample Comments to CSV/Text ===
+# One grouped top-k pass per export: the first five comments of each label for
+# the CSV, a random five for the text file
+with_comments = df.dropna(subset=["Subreddit", "Top_Comments"])
+sample_df = select_representatives(
+    with_comments, "Comment_Label", 5, by="order", groups=["Positive", "Negative", "Neutral"]
+)[["Subreddit", "Top_Comments", "Comment_Label"]].rename(columns={"Comment_Label": "Sentiment_Label"})
+sample_df.to_csv(os.path.join(OUTPUT_DIR, "sample_comments_all_sentiments.csv"), index=False)
+
+random_samples = select_representatives(
+    df.dropna(subset=["Top_Comments"]), "Comment_Label", 5, by="random",
+    groups=["Positive", "Neutral", "Negative"],
+).groupby("Comment_Label")["Top_Comments"]
 with open(os.path.join(OUTPUT_DIR, "sample_comments.txt"), "w", encoding="utf-8") as f:
     for label in ["Positive", "Neutral", "Negative"]:
-        subset = df[df["Comment_Label"] == label]
-        samples = subset["Top_Comments"].dropna().sample(min(5, len(subset))).tolist()
+        samples = random_samples.get_group(label) if label in random_samples.groups else []
         f.write(f"\n--- {label} Comments ---\n")
         for comment in samples:
             f.write(f"- {comment}\n")
@@ -221,48 +238,4 @@ with open(os.path.join(OUTPUT_DIR, "sentiment_summary.md"), "w", encoding="utf-8
         if file.endswith(".txt"):
             f.write(f"- `{file}`\n")
 
-# === Subreddit-Level Post vs Comment Sentiment Comparison ===
-post_comment_comp = (
-    df.groupby("Subreddit")[["Post_compound", "Comment_compound"]].mean().reset_index()
-)
-post_comment_comp.to_csv(os.path.join(OUTPUT_DIR, "subreddit_post_vs_comment_sentiment.csv"), index=False)
-
-plt.figure(figsize=(8, 6))
-sns.scatterplot(
-    data=post_comment_comp,
-    x="Post_compound",
-    y="Comment_compound",
-    hue="Subreddit",
-    legend=False,
-    alpha=0.7,
-)
-plt.axhline(0, color="gray", linestyle="--")
-plt.axvline(0, color="gray", linestyle="--")
-plt.title("Subreddit-Level: Post vs Comment Sentiment")
-plt.xlabel("Avg Post Sentiment")
-plt.ylabel("Avg Comment Sentiment")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "subreddit_post_vs_comment_scatter.png"), dpi=300)
-plt.close()
-
-# === Tone Difference Histogram ===
-plt.figure(figsize=(10, 6))
-sns.histplot(df["Comment_vs_Post"], bins=30, kde=True, color="darkred")
-plt.axvline(0, color="gray", linestyle="--")
-plt.xlabel("Comment - Post Sentiment")
-plt.title("Audience vs Author Tone Difference")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "tone_difference_hist.png"), dpi=300)
-plt.close()
-
-# === Full vs Post Difference Histogram ===
-plt.figure(figsize=(10, 6))
-sns.histplot(df["Full_vs_Post"], bins=30, kde=True, color="darkblue")
-plt.axvline(0, color="gray", linestyle="--")
-plt.title("Difference Between Full Context and Post Sentiment")
-plt.xlabel("Full Context - Post Sentiment")
-plt.tight_layout()
-plt.savefig(os.path.join(OUTPUT_DIR, "hist_full_vs_post_difference.png"), dpi=300)
-plt.close()
-
 print(f"\n✅ Sentiment pipeline complete. Results saved in: {OUTPUT_DIR}")
\ No newline at end of file
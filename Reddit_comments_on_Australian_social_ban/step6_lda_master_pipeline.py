@@ -1,130 +1,279 @@
+from pipeline_startup import ensure_nltk_resources, load_pyplot, record_startup, step_arg_parser
 import os
-import re
+import time
 import pandas as pd
-import nltk
-import matplotlib.pyplot as plt
-
-import pyLDAvis.gensim_models
-from nltk.corpus import stopwords
-from nltk.tokenize import TreebankWordTokenizer
-from nltk.stem import WordNetLemmatizer
-from gensim import corpora
+
 from gensim.models import LdaModel
 
-# === Download NLTK resources ===
-nltk.download("punkt")
-nltk.download("stopwords")
-nltk.download("wordnet")
+import lda_corpus
+from corpus_cache import analyzer_identity, cached_corpus
+from lda_corpus import BowStream, TokenStream, load_corpus, load_dictionary
+from lda_inference import write_doc_topic_matrix
+from lda_online import expand_model_vocabulary, grow_dictionary, topic_drift
+from lda_visualization import prepare_cached, save_pyldavis_html
+from post_schema import load_posts, report_memory
+from representative_select import select_representatives
+from topic_backends import BACKENDS, NmfBackend
+from text_normalizer import TextNormalizer
+
+# NLTK data the tokenizer needs; checked locally, never downloaded per run
+NLTK_RESOURCES = ("corpora/stopwords", "corpora/wordnet")
 
 # === Configurable paths ===
 BASE_FOLDER = "Reddit/results/topic_modeling"
 INPUT_CSV = "Reddit/results/preprocessing/reddit_keywords_stage3.csv"
-PREPROCESSED_PATH = os.path.join(BASE_FOLDER, "lda_preprocessed.pkl")
 MODEL_PATH = os.path.join(BASE_FOLDER, "lda_model_.gensim")
 TOPICS_TXT_PATH = os.path.join(BASE_FOLDER, "lda_topics.txt")
 OUTPUT_CSV_PATH = os.path.join(BASE_FOLDER, "lda_topics.csv")
 OUTPUT_IMG_PATH = os.path.join(BASE_FOLDER, "lda_topic_distribution.png")
-# OUTPUT_HTML_PATH = os.path.join(BASE_FOLDER, "lda_pyldavis.html")
+OUTPUT_HTML_PATH = os.path.join(BASE_FOLDER, "lda_pyldavis.html")
+COHERENCE_PATH = os.path.join(BASE_FOLDER, "lda_coherence.txt")
+UPDATE_REPORT_PATH = os.path.join(BASE_FOLDER, "lda_update_report.md")
+DOC_TOPIC_PATH = os.path.join(BASE_FOLDER, "lda_doc_topics.npy")
+TOPIC_LABELS_PATH = os.path.join(BASE_FOLDER, "lda_topic_labels.csv")
+NMF_MODEL_PATH = os.path.join(BASE_FOLDER, "nmf_model.pkl")
 
-os.makedirs(BASE_FOLDER, exist_ok=True)
+# Worker processes for tokenization (None = all cores)
+PREPROCESS_WORKERS = None
+# pyLDAvis preparation is slow the first time; it is then cached per model
+# (see lda_visualization), so re-rendering the HTML is instant
+EXPORT_PYLDAVIS = False
+# Model hyperparameters (see --sweep for a coherence-ranked grid search)
+NUM_TOPICS = 5
+PASSES = 10
+ALPHA = "auto"
+ETA = None
+# "single" (LdaModel) or "multicore" (LdaMulticore workers; gensim does not
+# support alpha="auto" there, so a symmetric prior is used instead)
+TRAIN_MODE = "single"
+LDA_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Topic model backend: "lda" (gensim) or "nmf" (sparse TF-IDF + NMF). Both
+# write the same lda_topics.csv columns and doc x topic matrix.
+BACKEND = "lda"
+MODEL_PATHS = {"lda": MODEL_PATH, "nmf": NMF_MODEL_PATH}
 
+# Final topic labels in order of Topic ID 0–4 (LDA only; other backends, or
+# an LDA with a different topic count, are labelled by their top terms)
+TOPIC_LABELS = [
+    "Data Privacy & Digital Safety",
+    "Platform Features & Tech Industry News",
+    "Youth Experiences & Impact on Kids",
+    "Confusion & Uncertainty",
+    "Political Reactions & Public Opinion",
+]
 
-# === Step 1: Preprocessing ===
-def preprocess_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[^a-z\s]", "", text)
-    tokenizer = TreebankWordTokenizer()
-    tokens = tokenizer.tokenize(text)
-    tokens = [t for t in tokens if t not in stopwords.words("english") and len(t) >= 3]
-    lemmatizer = WordNetLemmatizer()
-    tokens = [lemmatizer.lemmatize(t) for t in tokens]
-    return tokens
+os.makedirs(BASE_FOLDER, exist_ok=True)
 
 
+# === Step 1: Preprocessing ===
 def run_preprocessing():
     print("[1] Preprocessing...")
-    df = pd.read_csv(INPUT_CSV)
+    ensure_nltk_resources(*NLTK_RESOURCES)
+    df = load_posts(INPUT_CSV)
     df["Full_Text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
-    df["Tokens"] = df["Full_Text"].apply(preprocess_text)
-    df.to_pickle(PREPROCESSED_PATH)
-    print(f"[✓] Preprocessing complete. Saved to {PREPROCESSED_PATH}")
+    report_memory("step6 posts", df)
+    normalizer = TextNormalizer()
+    # Tokenized once into the shared corpus cache; reruns on unchanged input
+    # skip normalization entirely
+    cache = cached_corpus(
+        "lda",
+        df["Full_Text"],
+        lambda texts: normalizer.normalize_many(texts, workers=PREPROCESS_WORKERS),
+        df[[c for c in ["URL", "Subreddit", "Search_Term"] if c in df.columns]],
+        analyzer_name=(
+            f"TextNormalizer({normalizer.language}, {normalizer.min_length})"
+            f" {analyzer_identity(TextNormalizer)}"
+        ),
+    )
+    lda_corpus.write_tokens(cache.token_lists(), df["URL"])
+    print(f"[✓] Preprocessing complete. Saved to {lda_corpus.TOKENS_PATH}")
 
 
-# === Step 2: Model Training ===
-def run_lda_training():
-    print("[2] Training LDA model...")
-    df = pd.read_pickle(PREPROCESSED_PATH)
-    tokenized_docs = df["Tokens"].tolist()
-    dictionary = corpora.Dictionary(tokenized_docs)
-    dictionary.filter_extremes(no_below=5, no_above=0.5)
-    corpus = [dictionary.doc2bow(text) for text in tokenized_docs]
-    lda_model = LdaModel(
-        corpus=corpus,
-        id2word=dictionary,
-        num_topics=5,
-        random_state=42,
-        passes=10,
-        alpha="auto",
-        per_word_topics=True,
+# === Step 1b: Dictionary + Bag-of-Words Corpus ===
+def run_build_corpus():
+    print("[1b] Building dictionary and bag-of-words corpus...")
+    dictionary = lda_corpus.build_corpus()
+    print(
+        f"[✓] Dictionary ({len(dictionary)} terms) and corpus saved to "
+        f"{lda_corpus.DICTIONARY_PATH} and {lda_corpus.CORPUS_PATH}"
     )
+
+
+# === Step 2: Model Training ===
+def train_lda(corpus, dictionary, mode=TRAIN_MODE):
+    start = time.perf_counter()
+    if mode == "multicore":
+        from gensim.models import LdaMulticore
+
+        lda_model = LdaMulticore(
+            corpus=corpus,
+            id2word=dictionary,
+            num_topics=NUM_TOPICS,
+            random_state=42,
+            passes=PASSES,
+            alpha="symmetric" if ALPHA == "auto" else ALPHA,
+            eta=ETA,
+            per_word_topics=True,
+            workers=LDA_WORKERS,
+        )
+    else:
+        lda_model = LdaModel(
+            corpus=corpus,
+            id2word=dictionary,
+            num_topics=NUM_TOPICS,
+            random_state=42,
+            passes=PASSES,
+            alpha=ALPHA,
+            eta=ETA,
+            per_word_topics=True,
+        )
+    return lda_model, time.perf_counter() - start
+
+
+def run_lda_training(mode=TRAIN_MODE, backend=BACKEND):
+    dictionary = load_dictionary()
+    corpus = load_corpus()
+    if backend == "nmf":
+        print("[2] Training TF-IDF + NMF topic model...")
+        start = time.perf_counter()
+        topic_model = NmfBackend(NUM_TOPICS).fit(corpus, dictionary)
+        elapsed = time.perf_counter() - start
+    else:
+        print(f"[2] Training LDA model ({mode})...")
+        topic_model, elapsed = train_lda(corpus, dictionary, mode)
+    print(f"[✓] Trained in {elapsed:.1f}s")
+    topic_model.save(MODEL_PATHS[backend])
+    with open(TOPICS_TXT_PATH, "w", encoding="utf-8") as f:
+        for idx, topic in topic_model.print_topics(num_words=10):
+            f.write(f"Topic {idx}: {topic}\n")
+    print(f"[✓] Model and topics saved to {MODEL_PATHS[backend]} and {TOPICS_TXT_PATH}")
+
+
+# === Step 2b: Online Update ===
+# Folds posts whose URL is not yet in the token log into the saved model with
+# an online update instead of retraining. The dictionary grows under the
+# policy in lda_online; the corpus file is re-serialized by streaming.
+def run_lda_update(compare_retrain=True):
+    print("[2b] Updating LDA model with new posts...")
+    df = load_posts(INPUT_CSV)
+    seen = set(lda_corpus.read_doc_ids())
+    new_df = df[~df["URL"].isin(seen)]
+    if new_df.empty:
+        print("[✓] No new posts since the last update.")
+        return
+    ensure_nltk_resources(*NLTK_RESOURCES)
+    full_text = new_df["Title"].fillna("") + " " + new_df["Selftext"].fillna("")
+    new_tokens = TextNormalizer().normalize_many(full_text, workers=PREPROCESS_WORKERS)
+    lda_corpus.write_tokens(new_tokens, new_df["URL"], append=True)
+
+    dictionary = load_dictionary()
+    admitted = grow_dictionary(dictionary, new_tokens, lda_corpus.TOKENS_PATH)
+    previous = LdaModel.load(MODEL_PATH)
+    lda_model = LdaModel.load(MODEL_PATH)
+    expand_model_vocabulary(lda_model, dictionary)
+
+    start = time.perf_counter()
+    lda_model.update([dictionary.doc2bow(tokens) for tokens in new_tokens])
+    update_time = time.perf_counter() - start
+
     lda_model.save(MODEL_PATH)
+    dictionary.save(lda_corpus.DICTIONARY_PATH)
+    lda_corpus.serialize_corpus(dictionary)
     with open(TOPICS_TXT_PATH, "w", encoding="utf-8") as f:
         for idx, topic in lda_model.print_topics(num_words=10):
             f.write(f"Topic {idx}: {topic}\n")
-    print(f"[✓] Model and topics saved to {MODEL_PATH} and {TOPICS_TXT_PATH}")
+
+    lines = [
+        "# LDA Online Update Report",
+        "",
+        f"- New posts: {len(new_df)}",
+        f"- New terms admitted: {len(admitted)} (dictionary size {len(dictionary)})",
+        f"- Update time: {update_time:.2f}s",
+        "",
+        "## Drift vs previous model (Hellinger, matched topics)",
+    ]
+    for a, b, dist in topic_drift(previous, lda_model):
+        lines.append(f"- Topic {a} → {b}: {dist:.3f}")
+
+    if compare_retrain:
+        full_dictionary = lda_corpus.build_dictionary()
+        retrained, retrain_time = train_lda(
+            BowStream(full_dictionary), full_dictionary, TRAIN_MODE
+        )
+        lines += [
+            "",
+            f"## Drift vs full retrain ({retrain_time:.2f}s, "
+            f"{retrain_time / max(update_time, 1e-9):.1f}x the update time)",
+        ]
+        for a, b, dist in topic_drift(lda_model, retrained):
+            lines.append(f"- Topic {a} → {b}: {dist:.3f}")
+
+    with open(UPDATE_REPORT_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"[✓] Model updated in {update_time:.1f}s. Report saved to {UPDATE_REPORT_PATH}")
 
 
 # === Step 3: Assign Dominant Topics ===
-def run_assign_topics():
+def run_assign_topics(backend=BACKEND):
     print("[3] Assigning dominant topics with probabilities...")
-    df = pd.read_pickle(PREPROCESSED_PATH)
-    tokenized_docs = df["Tokens"].tolist()
-    dictionary = corpora.Dictionary(tokenized_docs)
-    dictionary.filter_extremes(no_below=5, no_above=0.5)
-    corpus = [dictionary.doc2bow(doc) for doc in tokenized_docs]
-    lda_model = LdaModel.load(MODEL_PATH)
-
-    dominant_topics = []
-    topic_probs = []
+    df = load_posts(INPUT_CSV)
+    df["Full_Text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
+    corpus = load_corpus()
+    topic_model = BACKENDS[backend].load(MODEL_PATHS[backend])
 
-    for bow in corpus:
-        topics = lda_model.get_document_topics(bow)
-        if topics:
-            dominant_topic, max_prob = max(topics, key=lambda x: x[1])
-        else:
-            dominant_topic, max_prob = None, None
-        dominant_topics.append(dominant_topic)
-        topic_probs.append(max_prob)
+    # Batched inference into the full doc x topic matrix (memory-mapped .npy)
+    doc_topics = write_doc_topic_matrix(topic_model, corpus, DOC_TOPIC_PATH)
 
-    df["Dominant_Topic"] = dominant_topics
-    df["Topic_Probability"] = topic_probs
+    # Corpus rows follow the token log (which online updates append to), so
+    # results are joined back onto the post table by URL. Doc_Topic_Row
+    # points each post at its row of the doc x topic matrix.
+    topics_df = pd.DataFrame(
+        {
+            "URL": lda_corpus.read_doc_ids(),
+            "Tokens": list(TokenStream()),
+            "Dominant_Topic": doc_topics.argmax(axis=1),
+            "Topic_Probability": doc_topics.max(axis=1),
+            "Doc_Topic_Row": range(len(doc_topics)),
+        }
+    )
+    df = df.merge(topics_df, on="URL", how="left")
+    report_memory("step6 topics", df)
 
     df.to_csv(OUTPUT_CSV_PATH, index=False)
     print(f"[✓] Topics and probabilities saved to {OUTPUT_CSV_PATH}")
+    print(f"[✓] Doc x topic matrix saved to {DOC_TOPIC_PATH}")
+
+    # Labels for the topics just assigned, read by the plot below and step7
+    labels = topic_labels(topic_model, backend)
+    pd.DataFrame({"Topic": range(len(labels)), "Label": labels}).to_csv(TOPIC_LABELS_PATH, index=False)
+    print(f"[✓] Topic labels saved to {TOPIC_LABELS_PATH}")
+
+
+def topic_labels(topic_model, backend):
+    if backend == "lda" and topic_model.num_topics == len(TOPIC_LABELS):
+        return list(TOPIC_LABELS)
+    return [
+        ", ".join(word for word, _ in topic_model.top_terms(k, topn=3))
+        for k in range(topic_model.num_topics)
+    ]
 
 
 # === Step 4: Plot & Visualize ===
 def run_plot_visualization():
     print("[4] Generating plots and HTML visualizations...")
-    df = pd.read_csv(OUTPUT_CSV_PATH)
+    plt = load_pyplot()
+    df = load_posts(OUTPUT_CSV_PATH)
 
     # Count number of posts per topic
     topic_counts = df["Dominant_Topic"].value_counts().sort_index()
 
-    # Final topic labels in order of Topic ID 0–4
-    topic_labels = [
-        "Data Privacy & Digital Safety",
-        "Platform Features & Tech Industry News",
-        "Youth Experiences & Impact on Kids",
-        "Confusion & Uncertainty",
-        "Political Reactions & Public Opinion",
-    ]
+    labels = pd.read_csv(TOPIC_LABELS_PATH).set_index("Topic")["Label"]
+    labels = [labels.get(int(k), f"Topic {int(k)}") for k in topic_counts.index]
 
     # Plot the bar chart
     plt.figure(figsize=(10, 6))
     bars = plt.bar(range(len(topic_counts)), topic_counts.values)
-    plt.xticks(range(len(topic_counts)), topic_labels, rotation=45, ha="right")
+    plt.xticks(range(len(topic_counts)), labels, rotation=45, ha="right")
     plt.ylabel("Number of Posts")
     plt.title("Topic Distribution")
 
@@ -143,9 +292,41 @@ def run_plot_visualization():
 
     plt.tight_layout()
     plt.savefig(OUTPUT_IMG_PATH)
+    plt.close()
     print(f"[✓] Bar chart saved to {OUTPUT_IMG_PATH}")
 
 
+# === Step 4b: Coherence ===
+def run_coherence(backend=BACKEND):
+    print("[4b] Scoring topic coherence (u_mass)...")
+    from gensim.models import CoherenceModel
+
+    topic_model = BACKENDS[backend].load(MODEL_PATHS[backend])
+    top_words = [
+        [word for word, _ in topic_model.top_terms(k, topn=20)]
+        for k in range(topic_model.num_topics)
+    ]
+    coherence = CoherenceModel(
+        topics=top_words,
+        corpus=load_corpus(),
+        dictionary=load_dictionary(),
+        coherence="u_mass",
+    ).get_coherence()
+    with open(COHERENCE_PATH, "w", encoding="utf-8") as f:
+        f.write(f"u_mass: {coherence:.4f}\n")
+    print(f"[✓] Coherence {coherence:.4f} saved to {COHERENCE_PATH}")
+
+
+# === Step 4c: pyLDAvis Export ===
+def run_pyldavis_export():
+    print("[4c] Preparing pyLDAvis visualization...")
+    lda_model = LdaModel.load(MODEL_PATH)
+    prepared = prepare_cached(lda_model, load_dictionary(), MODEL_PATH, DOC_TOPIC_PATH)
+    labels = pd.read_csv(TOPIC_LABELS_PATH)["Label"].tolist()
+    save_pyldavis_html(prepared, OUTPUT_HTML_PATH, topic_labels=labels)
+    print(f"[✓] pyLDAvis HTML saved to {OUTPUT_HTML_PATH}")
+
+
 # === Step 5: Extract Representative Posts ===
 def run_extract_representative_posts():
     print("[5] Extracting representative posts for each topic...")
@@ -158,7 +339,7 @@ def run_extract_representative_posts():
     prob_threshold = 0.5
     output_path = os.path.join(BASE_FOLDER, "reddit_representative_quotes.csv")
 
-    df = pd.read_csv(input_csv)
+    df = load_posts(input_csv)
     df["Full_Text"] = df["Title"].fillna("") + " " + df["Selftext"].fillna("")
     df["Full_Text"] = df["Full_Text"].str.strip()
     df["Length"] = df["Full_Text"].str.len()
@@ -172,31 +353,74 @@ def run_extract_representative_posts():
             f"[⚠] Column '{prob_column}' not found in data. Skipping probability filter."
         )
 
-    # Select top N posts per topic
-    sampled_posts = []
-    for topic in sorted(df[topic_column].dropna().unique()):
-        group = df[df[topic_column] == topic].copy()
-        group["LengthDiff"] = (group["Length"] - 250).abs()
-        top_posts = group.sort_values("LengthDiff").head(output_per_topic)
-        for _, row in top_posts.iterrows():
-            sampled_posts.append(
-                {
-                    "Topic": topic,
-                    "Topic_Probability": row.get(prob_column, None),
-                    "Reddit_Post": row["Full_Text"].strip(),
-                }
-            )
-
-    out_df = pd.DataFrame(sampled_posts)
+    # Select the N posts per topic closest to 250 characters
+    top_posts = select_representatives(
+        df, topic_column, output_per_topic, by="length", target_length=250
+    )
+    out_df = pd.DataFrame(
+        {
+            "Topic": top_posts[topic_column].to_numpy(),
+            "Topic_Probability": (
+                top_posts[prob_column].to_numpy() if prob_column in top_posts.columns else None
+            ),
+            "Reddit_Post": top_posts["Full_Text"].str.strip().to_numpy(),
+        }
+    )
     out_df.to_csv(output_path, index=False)
     print(f"[✓] Representative posts saved to {output_path}")
 
 
 # === Run All ===
 if __name__ == "__main__":
-    run_preprocessing()
-    run_lda_training()
-    run_assign_topics()
-    run_plot_visualization()
+    parser = step_arg_parser("LDA topic modeling pipeline")
+    parser.add_argument("--train-mode", choices=["single", "multicore"], default=TRAIN_MODE)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=BACKEND)
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="fold new posts into the saved model instead of retraining",
+    )
+    parser.add_argument(
+        "--skip-retrain-compare",
+        action="store_true",
+        help="with --update, skip the full retrain used to measure topic drift",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="grid-search num_topics/alpha/eta/passes on the persisted corpus and exit",
+    )
+    parser.add_argument(
+        "--pyldavis",
+        action="store_true",
+        help="export lda_pyldavis.html (prepared data is cached per model)",
+    )
+    args = parser.parse_args()
+    TRAIN_MODE = args.train_mode
+    if args.backend != "lda" and (args.update or args.sweep):
+        parser.error("--update and --sweep are only available with --backend lda")
+    record_startup("step6", plots=not args.no_plots)
+
+    if args.sweep:
+        from lda_sweep import run_sweep
+
+        if not os.path.exists(lda_corpus.CORPUS_PATH):
+            run_preprocessing()
+            run_build_corpus()
+        run_sweep()
+        raise SystemExit(0)
+
+    if args.update:
+        run_lda_update(compare_retrain=not args.skip_retrain_compare)
+    else:
+        run_preprocessing()
+        run_build_corpus()
+        run_lda_training(args.train_mode, args.backend)
+    run_assign_topics(args.backend)
+    if not args.no_plots:
+        run_plot_visualization()
+    run_coherence(args.backend)
+    if (EXPORT_PYLDAVIS or args.pyldavis) and not args.no_plots and args.backend == "lda":
+        run_pyldavis_export()
     run_extract_representative_posts()
     print("[✔] All steps completed.")
@@ -1,11 +1,22 @@
+from pipeline_startup import record_startup, step_arg_parser
 import pandas as pd
+import numpy as np
 import os
-import matplotlib.pyplot as plt
+
+import charts
+import lazy_backend
+from bootstrap_ci import bootstrap_ci, CI_LEVEL
+from chart_render import Chart, render_charts
+from post_schema import load_posts, report_memory
+from representative_select import select_representatives
 
 # ---------- Configuration ----------
 
 SENTIMENT_PATH = "Reddit/results/sentiment_outputs/reddit_with_sentiment.csv"
 TOPIC_PATH = "Reddit/results/topic_modeling/lda_topics.csv"
+DOC_TOPIC_PATH = "Reddit/results/topic_modeling/lda_doc_topics.npy"
+# Written by step6 for whichever backend produced the topics
+TOPIC_LABELS_PATH = "Reddit/results/topic_modeling/lda_topic_labels.csv"
 
 MERGED_OUTPUT_PATH = (
     "Reddit/results/sentiment_topic_overlay/merged_sentiment_and_topics.csv"
@@ -16,17 +27,12 @@ TOPIC_SENTIMENT_PNG = (
     "Reddit/results/sentiment_topic_overlay/topic_sentiment_overlay.png"
 )
 TOPIC_SENTIMENT_MD = "Reddit/results/sentiment_topic_overlay/topic_sentiment_summary.md"
+WEIGHTED_SENTIMENT_CSV = (
+    "Reddit/results/sentiment_topic_overlay/topic_weighted_sentiment.csv"
+)
 
 NUM_POSTS_PER_TOPIC = 5
 
-TOPIC_LABELS = {
-    0: "Politics & Governance",
-    1: "Parenting & Youth Challenges",
-    2: "Influencers & Platforms",
-    3: "Digital Identity & Youth Voice",
-    4: "Data Privacy & Regulation",
-}
-
 SENTIMENT_COLORS = {
     "Negative": "#B22222",
     "Neutral": "#B0B0B0",
@@ -34,19 +40,38 @@ SENTIMENT_COLORS = {
 }
 
 
+# ---------- Topic Labels ----------
+
+# Topic -> label from step6's labels file; topics missing from it (or every
+# topic, for runs older than the file) are called "Topic k"
+def load_topic_labels(path=TOPIC_LABELS_PATH):
+    if not os.path.exists(path):
+        return {}
+    labels = pd.read_csv(path)
+    return dict(zip(labels["Topic"].astype(int), labels["Label"]))
+
+
+def topic_label(labels, topic):
+    return labels.get(int(topic), f"Topic {int(topic)}")
+
+
 # ---------- Step 1: Merge Sentiment and Topic Data ----------
 
 
-def merge_datasets():
-    sentiment_df = pd.read_csv(SENTIMENT_PATH)
-    topics_df = pd.read_csv(TOPIC_PATH)
+def merge_datasets(engine="pandas"):
+    if engine == "polars":
+        merged = lazy_backend.merge_polars(SENTIMENT_PATH, TOPIC_PATH)
+    else:
+        sentiment_df = load_posts(SENTIMENT_PATH)
+        topics_df = load_posts(TOPIC_PATH)
 
-    merged = pd.merge(
-        sentiment_df,
-        topics_df[["Full_Text", "Dominant_Topic"]],
-        on="Full_Text",
-        how="inner",
-    )
+        report_memory("step7 sentiment", sentiment_df)
+        merged = pd.merge(
+            sentiment_df,
+            topics_df[["Full_Text", "Dominant_Topic"]],
+            on="Full_Text",
+            how="inner",
+        )
 
     os.makedirs(os.path.dirname(MERGED_OUTPUT_PATH), exist_ok=True)
     merged.to_csv(MERGED_OUTPUT_PATH, index=False)
@@ -58,22 +83,27 @@ def merge_datasets():
 
 
 def export_representative_posts():
-    df = pd.read_csv(TOPIC_PATH).dropna(subset=["Full_Text", "Dominant_Topic"])
+    df = load_posts(TOPIC_PATH).dropna(subset=["Full_Text", "Dominant_Topic"])
     df["Dominant_Topic"] = df["Dominant_Topic"].astype(int)
 
     txt_lines, md_lines = [], []
 
-    for topic, group in df.groupby("Dominant_Topic"):
-        label = TOPIC_LABELS.get(topic, f"Topic {topic}")
+    # Longest posts per topic, picked in one grouped top-k pass
+    topics = np.sort(df["Dominant_Topic"].unique())
+    labels = load_topic_labels()
+    filtered = df[df["Full_Text"].str.len() > 100]
+    selected = select_representatives(
+        filtered, "Dominant_Topic", NUM_POSTS_PER_TOPIC, by="length", groups=topics
+    )
+    posts_by_topic = selected.groupby("Dominant_Topic")["Full_Text"]
+
+    for topic in topics:
+        label = topic_label(labels, topic)
         txt_lines.append(f"\n--- Topic {topic}: {label} ---\n")
         md_lines.append(f"## Topic {topic}: {label}\n")
 
-        filtered = group[group["Full_Text"].str.len() > 100]
-        selected = filtered.sort_values(
-            by="Full_Text", key=lambda x: x.str.len(), ascending=False
-        ).head(NUM_POSTS_PER_TOPIC)
-
-        for i, post in enumerate(selected["Full_Text"], 1):
+        posts = posts_by_topic.get_group(topic) if topic in posts_by_topic.groups else []
+        for i, post in enumerate(posts, 1):
             txt_lines.append(f"Post {i}:\n{post}\n")
             md_lines.append(f"**Post {i}:**\n\n> {post.strip()}\n")
 
@@ -86,72 +116,113 @@ def export_representative_posts():
     print(f" - {REP_OUTPUT_TXT}\n - {REP_OUTPUT_MD}")
 
 
-# ---------- Step 4: Sentiment Overlay Visualization ----------
+# ---------- Step 3: Probability-Weighted Sentiment per Topic ----------
+
+# Every post contributes to every topic in proportion to its topic mixture
+# (rows of the doc x topic matrix from step6), instead of only to its
+# dominant topic.
+def probability_weighted_sentiment(df):
+    if not os.path.exists(DOC_TOPIC_PATH) or "Doc_Topic_Row" not in df.columns:
+        return None
+    df = df.dropna(subset=["Doc_Topic_Row", "Full_compound"])
+    mixtures = np.load(DOC_TOPIC_PATH, mmap_mode="r")
+    weights = np.asarray(mixtures[df["Doc_Topic_Row"].astype(int).to_numpy()], dtype=np.float64)
+
+    mass = weights.sum(axis=0)
+    result = pd.DataFrame(
+        {
+            "Topic": range(weights.shape[1]),
+            "Effective_Posts": mass,
+            "Weighted_Compound": weights.T @ df["Full_compound"].to_numpy() / mass,
+        }
+    )
+    for sentiment in ["Positive", "Neutral", "Negative"]:
+        is_label = (df["Full_Label"] == sentiment).to_numpy(dtype=np.float64)
+        result[f"Weighted_{sentiment}_Share"] = weights.T @ is_label / mass
+    result.to_csv(WEIGHTED_SENTIMENT_CSV, index=False)
+    print(f"[✓] Probability-weighted sentiment saved to {WEIGHTED_SENTIMENT_CSV}")
+    return result
 
 
-def plot_sentiment_overlay():
-    df = pd.read_csv(TOPIC_PATH)
-    sentiment_df = pd.read_csv(SENTIMENT_PATH)
+# ---------- Step 4: Sentiment Overlay Visualization ----------
+
 
-    df = df.merge(sentiment_df[["Full_Text", "Full_Label"]], on="Full_Text", how="left")
-    sentiment_counts = (
-        df.groupby(["Dominant_Topic", "Full_Label"]).size().unstack().fillna(0)
+def draw_overlay_chart(sentiment_percent):
+    render_charts(
+        [
+            Chart(
+                TOPIC_SENTIMENT_PNG,
+                charts.sentiment_overlay,
+                sentiment_percent[["Negative", "Neutral", "Positive"]],
+                {"colors": SENTIMENT_COLORS},
+                dpi=300,
+                bbox_inches="tight",
+            )
+        ]
     )
-    sentiment_percent = sentiment_counts.div(sentiment_counts.sum(axis=1), axis=0)
+    print(f"[✓] Sentiment plot saved to {TOPIC_SENTIMENT_PNG}")
 
-    sentiment_percent.index = sentiment_percent.index.map(TOPIC_LABELS)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bottom = [0] * len(sentiment_percent)
+def plot_sentiment_overlay(plots=True, engine="pandas"):
+    if engine == "polars":
+        df, sentiment_counts = lazy_backend.overlay_polars(TOPIC_PATH, SENTIMENT_PATH)
+    else:
+        df = load_posts(TOPIC_PATH)
+        sentiment_df = load_posts(SENTIMENT_PATH)
 
-    for sentiment in ["Negative", "Neutral", "Positive"]:
-        values = sentiment_percent[sentiment].values
-        bars = ax.bar(
-            sentiment_percent.index,
-            values,
-            bottom=bottom,
-            color=SENTIMENT_COLORS[sentiment],
-            edgecolor="black",
-            label=sentiment,
+        df = df.merge(
+            sentiment_df[["Full_Text", "Full_Label", "Full_compound"]], on="Full_Text", how="left"
         )
-        for bar, val in zip(bars, values):
-            if val > 0.05:
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2,
-                    bar.get_y() + val / 2,
-                    sentiment,
-                    ha="center",
-                    va="center",
-                    fontsize=9,
-                    color="white" if sentiment != "Neutral" else "black",
-                    weight="bold",
-                )
-        bottom = [i + j for i, j in zip(bottom, values)]
-
-    ax.set_title("Sentiment Overlay by Topic", fontsize=16, weight="bold")
-    ax.set_ylabel("Proportion of Sentiment", fontsize=13)
-    ax.set_xlabel("Topic", fontsize=13)
-    ax.set_ylim(0, 1.0)
-    ax.set_xticklabels(sentiment_percent.index, rotation=30, ha="right", fontsize=11)
-    ax.tick_params(axis="y", labelsize=11)
-    ax.grid(axis="y", linestyle="--", linewidth=0.5, alpha=0.7)
-    ax.legend().remove()
-
-    plt.tight_layout()
-    plt.savefig(TOPIC_SENTIMENT_PNG, dpi=300, bbox_inches="tight")
-    plt.show()
-    print(f"[✓] Sentiment plot saved to {TOPIC_SENTIMENT_PNG}")
+        sentiment_counts = df.groupby(["Dominant_Topic", "Full_Label"]).size().unstack()
+    sentiment_counts = sentiment_counts.fillna(0)
+    sentiment_percent = sentiment_counts.div(sentiment_counts.sum(axis=1), axis=0)
+
+    labels = load_topic_labels()
+    sentiment_percent.index = sentiment_percent.index.map(lambda topic: topic_label(labels, topic))
+
+    if plots:
+        draw_overlay_chart(sentiment_percent)
+
+    # Bootstrap intervals on each sentiment share per topic
+    labelled = df.dropna(subset=["Dominant_Topic", "Full_Label"])
+    shares = pd.DataFrame({"Dominant_Topic": labelled["Dominant_Topic"]})
+    for sentiment in ["Positive", "Neutral", "Negative"]:
+        shares[sentiment] = (labelled["Full_Label"] == sentiment).astype(float)
+    share_ci = bootstrap_ci(
+        shares, "Dominant_Topic", ["Positive", "Neutral", "Negative"]
+    ).set_index("Dominant_Topic")
 
     # Markdown Summary
     md_lines = ["# Sentiment Overlay Report", ""]
     for topic in sorted(sentiment_counts.index):
-        label = TOPIC_LABELS.get(topic, f"Topic {topic}")
+        label = topic_label(labels, topic)
         total = sentiment_counts.loc[topic].sum()
         md_lines.append(f"## Topic {topic}: {label}")
         for sentiment in ["Positive", "Neutral", "Negative"]:
             count = sentiment_counts.loc[topic].get(sentiment, 0)
             percent = (count / total) * 100 if total > 0 else 0
-            md_lines.append(f"- **{sentiment}**: {count} posts ({percent:.1f}%)")
+            low = share_ci.loc[topic, f"{sentiment}_ci_low"] * 100
+            high = share_ci.loc[topic, f"{sentiment}_ci_high"] * 100
+            method = share_ci.loc[topic, f"{sentiment}_ci_method"]
+            md_lines.append(
+                f"- **{sentiment}**: {count} posts ({percent:.1f}%, "
+                f"{CI_LEVEL:.0%} {method} CI {low:.1f}–{high:.1f}%)"
+            )
+        md_lines.append("")
+
+    weighted = probability_weighted_sentiment(df)
+    if weighted is not None:
+        md_lines.append("## Probability-Weighted Sentiment (full topic mixtures)")
+        for _, row in weighted.iterrows():
+            topic = int(row["Topic"])
+            label = topic_label(labels, topic)
+            md_lines.append(
+                f"- **Topic {topic}: {label}**: {row['Effective_Posts']:.1f} effective posts, "
+                f"mean compound {row['Weighted_Compound']:.3f}, "
+                f"{row['Weighted_Positive_Share']:.1%} positive / "
+                f"{row['Weighted_Neutral_Share']:.1%} neutral / "
+                f"{row['Weighted_Negative_Share']:.1%} negative"
+            )
         md_lines.append("")
 
     with open(TOPIC_SENTIMENT_MD, "w", encoding="utf-8") as f:
@@ -163,6 +234,9 @@ def plot_sentiment_overlay():
 # ---------- Main Execution ----------
 
 if __name__ == "__main__":
-    merge_datasets()
+    args = lazy_backend.add_engine_argument(step_arg_parser("Sentiment x topic overlay")).parse_args()
+    record_startup("step7", plots=not args.no_plots)
+    engine = lazy_backend.resolve_engine(args.engine)
+    merge_datasets(engine)
     export_representative_posts()
-    plot_sentiment_overlay()
+    plot_sentiment_overlay(plots=not args.no_plots, engine=engine)
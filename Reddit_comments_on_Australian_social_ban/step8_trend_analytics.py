@@ -0,0 +1,230 @@
+from pipeline_startup import load_pyplot, record_startup, step_arg_parser
+import os
+
+import numpy as np
+import pandas as pd
+
+from post_schema import load_posts, report_memory
+
+# === CONFIG ===
+SENTIMENT_PATH = "Reddit/results/sentiment_outputs/reddit_with_sentiment.csv"
+TOPIC_PATH = "Reddit/results/topic_modeling/lda_topics.csv"
+DOC_TOPIC_PATH = "Reddit/results/topic_modeling/lda_doc_topics.npy"
+OUTPUT_DIR = "Reddit/results/trends"
+SEEN_URLS_PATH = os.path.join(OUTPUT_DIR, "trend_seen_urls.txt")
+
+# Period frequency and rolling window (in periods) per granularity; weekly
+# periods end on Sunday, so each week is labelled by its Monday
+WINDOWS = {
+    "daily": {"freq": "D", "rolling": 7},
+    "weekly": {"freq": "W-SUN", "rolling": 4},
+}
+ALL_SUBREDDITS = "ALL"
+EVENTS = {
+    "Ban announced": "2024-11-07",
+    "Online Safety Amendment passed": "2024-11-29",
+}
+
+
+def aggregates_path(window):
+    return os.path.join(OUTPUT_DIR, f"trend_aggregates_{window}.csv")
+
+
+# === Load New Posts ===
+# Posts already folded into the aggregates are listed (by URL) in
+# SEEN_URLS_PATH, so each run only touches rows appended since the last one.
+def created_epoch(df):
+    if "Created_Epoch" in df.columns:
+        return pd.to_numeric(df["Created_Epoch"], errors="coerce")
+    # Files exported before Created_Epoch existed
+    created = pd.to_datetime(df["Created_UTC"], errors="coerce")
+    return (created - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+
+def read_seen_urls():
+    if not os.path.exists(SEEN_URLS_PATH):
+        return set()
+    with open(SEEN_URLS_PATH, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f}
+
+
+def load_new_posts(seen):
+    df = load_posts(SENTIMENT_PATH)
+    report_memory("step8", df)
+    df = df[~df["URL"].isin(seen)].drop_duplicates(subset="URL")
+    df["Created_Epoch"] = created_epoch(df)
+    df = df.dropna(subset=["Created_Epoch"])
+    df["Created_Epoch"] = df["Created_Epoch"].astype(np.int64)
+
+    topic_cols = []
+    if os.path.exists(TOPIC_PATH):
+        topics = pd.read_csv(TOPIC_PATH, usecols=lambda c: c in {"URL", "Dominant_Topic", "Doc_Topic_Row"})
+        df = df.merge(topics.drop_duplicates(subset="URL"), on="URL", how="left")
+        # Topic shares from the full doc x topic mixtures when available,
+        # otherwise one-hot on the dominant topic
+        if "Doc_Topic_Row" in df.columns and os.path.exists(DOC_TOPIC_PATH):
+            mixtures = np.load(DOC_TOPIC_PATH, mmap_mode="r")
+            rows = df["Doc_Topic_Row"]
+            shares = np.zeros((len(df), mixtures.shape[1]))
+            known = rows.notna().to_numpy()
+            shares[known] = mixtures[rows[known].astype(int).to_numpy()]
+        else:
+            known = df["Dominant_Topic"].notna().to_numpy()
+            n_topics = int(df["Dominant_Topic"].max()) + 1 if known.any() else 0
+            shares = np.zeros((len(df), n_topics))
+            shares[np.flatnonzero(known), df.loc[known, "Dominant_Topic"].astype(int)] = 1.0
+        topic_cols = [f"Topic_{k}" for k in range(shares.shape[1])]
+        df[topic_cols] = shares
+        df["Topic_N"] = known.astype(np.int64)
+    return df, topic_cols
+
+
+# === Incremental Aggregates ===
+# Aggregates hold additive sums per (period, subreddit), plus an ALL row per
+# period, so new posts are merged in with a groupby-sum instead of
+# recomputing means over history. Topic columns refer to the current model's
+# topic ids; run with --rebuild after retraining the topic model.
+def aggregate(df, freq, topic_cols):
+    period = pd.to_datetime(df["Created_Epoch"], unit="s").dt.to_period(freq).dt.start_time
+    frame = pd.DataFrame(
+        {
+            "Period": period,
+            "Subreddit": df["Subreddit"].astype(object).fillna("unknown"),
+            "Posts": 1,
+            "Compound_N": df["Full_compound"].notna().astype(np.int64),
+            "Compound_Sum": df["Full_compound"].fillna(0.0),
+        }
+    )
+    if topic_cols:
+        frame["Topic_N"] = df["Topic_N"].to_numpy()
+        for col in topic_cols:
+            frame[f"{col}_Sum"] = df[col].to_numpy()
+    frame = pd.concat([frame, frame.assign(Subreddit=ALL_SUBREDDITS)])
+    return frame.groupby(["Period", "Subreddit"], as_index=False).sum()
+
+
+def merge_aggregates(old, new):
+    if old is None or old.empty:
+        return new
+    merged = pd.concat([old, new], ignore_index=True).fillna(0)
+    return merged.groupby(["Period", "Subreddit"], as_index=False).sum()
+
+
+def load_aggregates(window):
+    path = aggregates_path(window)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, parse_dates=["Period"])
+
+
+def update_aggregates(rebuild=False):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if rebuild:
+        for window in WINDOWS:
+            if os.path.exists(aggregates_path(window)):
+                os.remove(aggregates_path(window))
+        if os.path.exists(SEEN_URLS_PATH):
+            os.remove(SEEN_URLS_PATH)
+
+    new_posts, topic_cols = load_new_posts(read_seen_urls())
+    results = {}
+    for window, spec in WINDOWS.items():
+        old = load_aggregates(window)
+        merged = old if new_posts.empty else merge_aggregates(old, aggregate(new_posts, spec["freq"], topic_cols))
+        if merged is not None:
+            merged.to_csv(aggregates_path(window), index=False)
+        results[window] = merged
+
+    with open(SEEN_URLS_PATH, "a", encoding="utf-8") as f:
+        f.writelines(f"{url}\n" for url in new_posts["URL"])
+    print(f"[✓] Folded {len(new_posts)} new posts into daily and weekly aggregates")
+    return results
+
+
+# === Trend Tables ===
+# Means and rolling means are derived from the sums. Each subreddit's series
+# is reindexed onto a continuous period range so the rolling window spans
+# calendar time, not just the periods that happened to have posts.
+def trend_table(agg, freq, rolling):
+    sum_cols = [c for c in agg.columns if c not in ("Period", "Subreddit")]
+    topic_cols = [c for c in sum_cols if c.startswith("Topic_") and c.endswith("_Sum")]
+    periods = pd.period_range(agg["Period"].min(), agg["Period"].max(), freq=freq).start_time
+
+    frames = []
+    for subreddit, group in agg.groupby("Subreddit"):
+        series = group.set_index("Period")[sum_cols].reindex(periods, fill_value=0)
+        rolled = series.rolling(rolling, min_periods=1).sum()
+        out = pd.DataFrame({"Period": periods, "Subreddit": subreddit, "Posts": series["Posts"].to_numpy()})
+        out["Mean_Compound"] = (series["Compound_Sum"] / series["Compound_N"].replace(0, np.nan)).to_numpy()
+        out[f"Rolling_{rolling}_Compound"] = (
+            rolled["Compound_Sum"] / rolled["Compound_N"].replace(0, np.nan)
+        ).to_numpy()
+        for col in topic_cols:
+            name = col[: -len("_Sum")]
+            out[f"{name}_Share"] = (series[col] / series["Topic_N"].replace(0, np.nan)).to_numpy()
+            out[f"Rolling_{rolling}_{name}_Share"] = (
+                rolled[col] / rolled["Topic_N"].replace(0, np.nan)
+            ).to_numpy()
+        frames.append(out[out["Posts"] > 0] if subreddit != ALL_SUBREDDITS else out)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_trends(aggregates, plots=True):
+    tables = {}
+    for window, spec in WINDOWS.items():
+        agg = aggregates.get(window)
+        if agg is None or agg.empty:
+            continue
+        table = trend_table(agg, spec["freq"], spec["rolling"])
+        path = os.path.join(OUTPUT_DIR, f"trend_{window}.csv")
+        table.to_csv(path, index=False)
+        tables[window] = table
+        print(f"[✓] {window.capitalize()} trends saved to {path}")
+
+    if plots and "weekly" in tables:
+        plot_weekly_trends(tables["weekly"], WINDOWS["weekly"]["rolling"])
+    return tables
+
+
+def plot_weekly_trends(table, rolling):
+    plt = load_pyplot()
+    overall = table[table["Subreddit"] == ALL_SUBREDDITS]
+    prefix = f"Rolling_{rolling}_"
+    share_cols = [c for c in overall.columns if c.startswith(prefix) and c.endswith("_Share")]
+
+    fig, axes = plt.subplots(2 if share_cols else 1, 1, figsize=(12, 9 if share_cols else 5), sharex=True,
+                             squeeze=False)
+    ax = axes[0, 0]
+    ax.plot(overall["Period"], overall[f"Rolling_{rolling}_Compound"], color="royalblue", marker="o")
+    ax.axhline(0, color="gray", linestyle="--")
+    ax.set_ylabel(f"Compound ({rolling}-week rolling mean)")
+    ax.set_title("Sentiment and Topic Share Over Time")
+    if share_cols:
+        ax2 = axes[1, 0]
+        ax2.stackplot(
+            overall["Period"],
+            *[overall[c].fillna(0) for c in share_cols],
+            labels=[c[len(prefix): -len("_Share")] for c in share_cols],
+        )
+        ax2.set_ylabel(f"Topic share ({rolling}-week rolling)")
+        ax2.legend(title="Topic", loc="upper left", fontsize=8)
+    for row in axes:
+        for event, date in EVENTS.items():
+            row[0].axvline(pd.Timestamp(date), color="firebrick", linestyle=":")
+            row[0].annotate(event, (pd.Timestamp(date), 1), xycoords=("data", "axes fraction"),
+                            rotation=90, va="top", ha="right", fontsize=8)
+    plt.tight_layout()
+    path = os.path.join(OUTPUT_DIR, "weekly_trends.png")
+    plt.savefig(path, dpi=300)
+    plt.close()
+    print(f"[✓] Trend plot saved to {path}")
+
+
+# === Run ===
+if __name__ == "__main__":
+    parser = step_arg_parser("Incremental sentiment and topic trends")
+    parser.add_argument("--rebuild", action="store_true", help="drop saved aggregates and start over")
+    args = parser.parse_args()
+    record_startup("step8", plots=not args.no_plots)
+    aggregates = update_aggregates(rebuild=args.rebuild)
+    write_trends(aggregates, plots=not args.no_plots)
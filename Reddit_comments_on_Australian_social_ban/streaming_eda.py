@@ -0,0 +1,197 @@
+from pipeline_startup import load_pyplot, record_startup, step_arg_parser
+import hashlib
+import io
+import itertools
+import os
+import pickle
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sketches import KLLSketch, SpaceSaving
+
+# === CONFIG ===
+# Append-only log written by step5: each post is appended once, the first time
+# it is scored. reddit_with_sentiment.csv itself is rewritten in full every
+# run, so pointing --input at it rebuilds the sketches each time.
+INPUT_FILE = "Reddit/results/sentiment_outputs/sentiment_stream_log.csv"
+OUTPUT_DIR = "Reddit/results/streaming_eda"
+CHUNK_SIZE = 2000
+WORKERS = None
+TOP_N = 5
+GLOBAL_TOP_N = 20
+HIST_BINS = 30
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+METRICS = ["Score", "Num_Comments", "Post_compound", "Comment_compound", "Full_compound"]
+# Bytes before the watermark that must be unchanged for an incremental run
+TAIL_CHECK_BYTES = 256
+
+URL_RE = re.compile(r"http\S+")
+NON_WORD_RE = re.compile(r"[^\w\s]")
+DIGITS_RE = re.compile(r"\d+")
+
+
+# Same title cleaning as step4's clean_text
+def title_words(text):
+    text = str(text).lower()
+    return DIGITS_RE.sub("", NON_WORD_RE.sub("", URL_RE.sub("", text))).split()
+
+
+# === Sketch State ===
+# Everything the report needs, in bounded memory: a SpaceSaving summary of
+# title words overall and per subreddit, and a KLL sketch per numeric column.
+# Two states merge field by field, so chunks can be sketched by workers.
+def empty_state():
+    return {"rows": 0, "words": SpaceSaving(), "by_subreddit": {}, "metrics": {}}
+
+
+def merge_states(a, b):
+    a["rows"] += b["rows"]
+    a["words"].merge(b["words"])
+    for sub, sketch in b["by_subreddit"].items():
+        a["by_subreddit"].setdefault(sub, SpaceSaving()).merge(sketch)
+    for metric, sketch in b["metrics"].items():
+        if metric in a["metrics"]:
+            a["metrics"][metric].merge(sketch)
+        else:
+            a["metrics"][metric] = sketch
+    return a
+
+
+def sketch_chunk(chunk):
+    state = empty_state()
+    state["rows"] = len(chunk)
+    for sub, titles in chunk["Title"].groupby(chunk["Subreddit"], sort=False, dropna=False):
+        counts = Counter(w for t in titles.dropna() for w in title_words(t))
+        state["words"].update(counts)
+        if pd.notna(sub):
+            state["by_subreddit"].setdefault(sub, SpaceSaving()).update(counts)
+    for metric in METRICS:
+        if metric in chunk.columns:
+            sketch = KLLSketch()
+            sketch.update(pd.to_numeric(chunk[metric], errors="coerce").to_numpy())
+            state["metrics"][metric] = sketch
+    return state
+
+
+# One state file per input, so sketches of different files never mix
+def state_path(path):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(OUTPUT_DIR, f"sketch_state_{name}_{key}.pkl")
+
+
+# === Watermark ===
+# The input is treated as append-only: the state remembers the byte offset it
+# has consumed, the header, and the bytes just before the offset. If any of
+# them changed, the file was rewritten rather than appended to, and the
+# sketches are rebuilt from the start.
+def load_state(path, header, rebuild=False):
+    if rebuild or not os.path.exists(state_path(path)):
+        return None
+    with open(state_path(path), "rb") as f:
+        state = pickle.load(f)
+    size = os.path.getsize(path)
+    if state["header"] != header or state["offset"] > size:
+        return None
+    with open(path, "rb") as f:
+        f.seek(max(0, state["offset"] - TAIL_CHECK_BYTES))
+        tail = f.read(min(state["offset"], TAIL_CHECK_BYTES))
+    return state if tail == state["tail"] else None
+
+
+# Parses only the bytes after the watermark, CHUNK_SIZE rows at a time
+def read_new_rows(path, offset, header):
+    names = pd.read_csv(io.StringIO(header.decode("utf-8")), nrows=0).columns
+    if os.path.getsize(path) <= offset:
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        yield from pd.read_csv(f, header=None, names=names, chunksize=CHUNK_SIZE)
+
+
+def update_state(path=INPUT_FILE, workers=WORKERS, rebuild=False):
+    with open(path, "rb") as f:
+        header = f.readline()
+    state = load_state(path, header, rebuild)
+    if state is None:
+        state = {**empty_state(), "header": header, "offset": len(header), "tail": b""}
+    end = os.path.getsize(path)
+
+    new_rows = 0
+    chunks = read_new_rows(path, state["offset"], header)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # At most `workers` chunks are in flight, so memory stays bounded
+        while True:
+            batch = list(itertools.islice(chunks, workers))
+            if not batch:
+                break
+            for chunk_state in pool.map(sketch_chunk, batch):
+                new_rows += chunk_state["rows"]
+                merge_states(state, chunk_state)
+
+    with open(path, "rb") as f:
+        f.seek(max(0, end - TAIL_CHECK_BYTES))
+        state["tail"] = f.read(min(end, TAIL_CHECK_BYTES))
+    state["offset"] = end
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(state_path(path), "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"[✓] Sketched {new_rows} new rows ({state['rows']} total). State saved to {state_path(path)}")
+    return state
+
+
+# === Reports ===
+def write_reports(state, plots=True):
+    with open(os.path.join(OUTPUT_DIR, "top_keywords_stream.txt"), "w", encoding="utf-8") as f:
+        f.write("All subreddits:\n")
+        for word, count, error in state["words"].top(GLOBAL_TOP_N):
+            f.write(f"  {word}: {count} (±{error})\n")
+        f.write("\n")
+        for sub in sorted(state["by_subreddit"]):
+            f.write(f"{sub}:\n")
+            for word, count, error in state["by_subreddit"][sub].top(TOP_N):
+                f.write(f"  {word}: {count} (±{error})\n")
+            f.write("\n")
+
+    rows, hist_rows = [], []
+    for metric, sketch in state["metrics"].items():
+        rows.append(
+            {"Metric": metric, "Count": sketch.count, "Min": sketch.min, "Max": sketch.max,
+             **{f"p{round(q * 100):02d}": v for q, v in zip(QUANTILES, sketch.quantiles(QUANTILES))}}
+        )
+        edges = np.linspace(sketch.min, sketch.max, HIST_BINS + 1)
+        for low, high, count in zip(edges[:-1], edges[1:], sketch.histogram(edges)):
+            hist_rows.append({"Metric": metric, "Bin_Low": low, "Bin_High": high, "Count": count})
+    pd.DataFrame(rows).to_csv(os.path.join(OUTPUT_DIR, "metric_quantiles.csv"), index=False)
+    histograms = pd.DataFrame(hist_rows)
+    histograms.to_csv(os.path.join(OUTPUT_DIR, "metric_histograms.csv"), index=False)
+    print(f"[✓] Top words, quantiles and histograms saved to {OUTPUT_DIR}")
+
+    if plots and not histograms.empty:
+        plt = load_pyplot()
+        for metric, hist in histograms.groupby("Metric", sort=False):
+            plt.figure(figsize=(10, 6))
+            plt.bar(hist["Bin_Low"], hist["Count"], width=hist["Bin_High"] - hist["Bin_Low"],
+                    align="edge", color="royalblue", edgecolor="black")
+            plt.title(f"{metric} Distribution (sketch)")
+            plt.xlabel(metric)
+            plt.ylabel("Posts")
+            plt.tight_layout()
+            plt.savefig(os.path.join(OUTPUT_DIR, f"{metric.lower()}_hist.png"))
+            plt.close()
+
+
+if __name__ == "__main__":
+    parser = step_arg_parser("Streaming EDA with mergeable sketches")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rebuild", action="store_true", help="ignore the saved state")
+    args = parser.parse_args()
+    record_startup("streaming_eda", plots=not args.no_plots)
+    state = update_state(args.input, args.workers, args.rebuild)
+    write_reports(state, plots=not args.no_plots)
@@ -0,0 +1,73 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import TreebankWordTokenizer
+
+# === CONFIG ===
+MIN_TOKEN_LENGTH = 3
+LEMMA_CACHE_SIZE = 100_000
+CHUNK_SIZE = 500
+
+URL_RE = re.compile(r"http\S+")
+NON_ALPHA_RE = re.compile(r"[^a-z\s]")
+
+
+# === Normalizer ===
+# Same token stream as the original step6 preprocess_text, with everything
+# that does not depend on the document built once per process: the stopword
+# table is a frozenset, regexes are precompiled, and lemmas are memoized in a
+# bounded LRU cache (Reddit vocabulary is heavily Zipfian).
+class TextNormalizer:
+    def __init__(self, language="english", min_length=MIN_TOKEN_LENGTH, cache_size=LEMMA_CACHE_SIZE):
+        self.language = language
+        self.min_length = min_length
+        self.cache_size = cache_size
+        self.stopwords = frozenset(stopwords.words(language))
+        self.tokenizer = TreebankWordTokenizer()
+        self.lemmatizer = WordNetLemmatizer()
+        self.lemmatize = lru_cache(maxsize=cache_size)(self.lemmatizer.lemmatize)
+
+    def __call__(self, text):
+        text = NON_ALPHA_RE.sub("", URL_RE.sub("", text.lower()))
+        stop, min_length, lemmatize = self.stopwords, self.min_length, self.lemmatize
+        return [
+            lemmatize(t)
+            for t in self.tokenizer.tokenize(text)
+            if t not in stop and len(t) >= min_length
+        ]
+
+    # Chunked process-pool mode: each worker builds its own normalizer once
+    # and handles CHUNK_SIZE documents per task, so the stopword table and
+    # lemma cache are reused across a whole chunk.
+    def normalize_many(self, texts, workers=None, chunk_size=CHUNK_SIZE):
+        texts = list(texts)
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(texts) <= chunk_size:
+            return [self(t) for t in texts]
+        chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.language, self.min_length, self.cache_size),
+        ) as pool:
+            results = []
+            for tokens in pool.map(_normalize_chunk, chunks):
+                results.extend(tokens)
+        return results
+
+
+# === Process-Pool Workers ===
+_worker_normalizer = None
+
+
+def _init_worker(language, min_length, cache_size):
+    global _worker_normalizer
+    _worker_normalizer = TextNormalizer(language, min_length, cache_size)
+
+
+def _normalize_chunk(texts):
+    return [_worker_normalizer(t) for t in texts]
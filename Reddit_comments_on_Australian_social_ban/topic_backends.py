@@ -0,0 +1,155 @@
+import pickle
+from abc import ABC, abstractmethod
+
+import numpy as np
+from gensim import matutils
+from gensim.models import LdaModel
+
+from lda_inference import infer_topic_mixtures
+
+# === CONFIG ===
+NMF_MAX_ITER = 400
+NMF_INIT = "nndsvda"
+SEED = 42
+
+
+# === Backend Interface ===
+# Every backend trains on the persisted bag-of-words corpus and dictionary
+# (lda_corpus) and exposes the same three things step6 needs downstream:
+# row-normalized topic mixtures for a batch of bows, a topic x term matrix
+# for keywords/coherence, and save/load. A backend missing any of them fails
+# when it is constructed.
+class TopicBackend(ABC):
+    name = None
+
+    def __init__(self, num_topics):
+        self.num_topics = num_topics
+        self.id2word = None
+
+    @abstractmethod
+    def fit(self, corpus, dictionary):
+        raise NotImplementedError
+
+    @abstractmethod
+    def topic_mixtures(self, bows):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_topics(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, path):
+        raise NotImplementedError
+
+    @classmethod
+    @abstractmethod
+    def load(cls, path):
+        raise NotImplementedError
+
+    def top_terms(self, topic, topn=10):
+        weights = self.get_topics()[topic]
+        ids = matutils.argsort(weights, topn=topn, reverse=True)
+        return [(self.id2word[int(i)], float(weights[i])) for i in ids]
+
+    def print_topics(self, num_words=10):
+        return [
+            (k, " + ".join(f'{w:.3f}*"{t}"' for t, w in self.top_terms(k, num_words)))
+            for k in range(self.num_topics)
+        ]
+
+
+# === Gensim LDA ===
+class GensimLdaBackend(TopicBackend):
+    name = "lda"
+
+    def __init__(self, num_topics, model=None, **lda_kwargs):
+        super().__init__(num_topics)
+        self.model = model
+        self.lda_kwargs = lda_kwargs
+        if model is not None:
+            self.id2word = model.id2word
+
+    def fit(self, corpus, dictionary):
+        self.model = LdaModel(
+            corpus=corpus, id2word=dictionary, num_topics=self.num_topics, **self.lda_kwargs
+        )
+        self.id2word = dictionary
+        return self
+
+    def topic_mixtures(self, bows):
+        return infer_topic_mixtures(self.model, bows)
+
+    def get_topics(self):
+        return self.model.get_topics()
+
+    def save(self, path):
+        self.model.save(path)
+
+    @classmethod
+    def load(cls, path):
+        model = LdaModel.load(path)
+        return cls(model.num_topics, model=model)
+
+
+# === Sparse TF-IDF + NMF ===
+# Factorizes the TF-IDF weighted doc x term matrix (kept sparse end to end)
+# with scikit-learn's coordinate-descent NMF. Document mixtures are the
+# rows of W normalized to sum to 1, so they slot into Dominant_Topic /
+# Topic_Probability exactly like LDA's; documents with no known terms get
+# a uniform mixture.
+class NmfBackend(TopicBackend):
+    name = "nmf"
+
+    def __init__(self, num_topics, max_iter=NMF_MAX_ITER, init=NMF_INIT, random_state=SEED):
+        super().__init__(num_topics)
+        self.max_iter = max_iter
+        self.init = init
+        self.random_state = random_state
+        self.tfidf = None
+        self.nmf = None
+
+    def _doc_term(self, bows):
+        return matutils.corpus2csc(bows, num_terms=len(self.id2word), num_docs=len(bows)).T.tocsr()
+
+    def fit(self, corpus, dictionary):
+        from sklearn.decomposition import NMF
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        self.id2word = dictionary
+        doc_term = matutils.corpus2csc(corpus, num_terms=len(dictionary)).T.tocsr()
+        self.tfidf = TfidfTransformer()
+        self.nmf = NMF(
+            n_components=self.num_topics,
+            init=self.init,
+            max_iter=self.max_iter,
+            random_state=self.random_state,
+        )
+        self.nmf.fit(self.tfidf.fit_transform(doc_term))
+        return self
+
+    def topic_mixtures(self, bows):
+        if not bows:
+            return np.zeros((0, self.num_topics), dtype=np.float32)
+        weights = self.nmf.transform(self.tfidf.transform(self._doc_term(list(bows))))
+        totals = weights.sum(axis=1, keepdims=True)
+        mixtures = np.divide(
+            weights, totals, out=np.full_like(weights, 1 / self.num_topics), where=totals > 0
+        )
+        return mixtures.astype(np.float32)
+
+    def get_topics(self):
+        components = self.nmf.components_
+        return components / components.sum(axis=1, keepdims=True)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+BACKENDS = {backend.name: backend for backend in (GensimLdaBackend, NmfBackend)}